@@ -0,0 +1,71 @@
+"""
+Benchmark the vectorized compute_boxplot_stats against the previous
+describe/merge implementation.
+
+Usage:
+    python -m benchmarks.bench_boxplot [--repeat N]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.callbacks.charts import compute_boxplot_stats
+
+SIZES = (10_000, 100_000, 1_000_000)
+
+def reference_compute_boxplot_stats(group_df, group_col):
+    """The describe()/merge implementation that compute_boxplot_stats replaced."""
+    stats = group_df.groupby(group_col)["Price"].describe().reset_index()
+    stats = stats.rename(columns={'25%': 'Q1', '50%': 'median', '75%': 'Q3'})
+    stats['IQR'] = stats['Q3'] - stats['Q1']
+    stats['whisker_low_limit'] = stats['Q1'] - 1.5 * stats['IQR']
+    stats['whisker_high_limit'] = stats['Q3'] + 1.5 * stats['IQR']
+
+    group_df = group_df.merge(stats[[group_col, 'whisker_low_limit', 'whisker_high_limit']],
+                             on=group_col, how='left')
+    whisker_low = group_df[group_df['Price'] >= group_df['whisker_low_limit']]\
+                     .groupby(group_col)['Price'].min().rename('Min')
+    whisker_high = group_df[group_df['Price'] <= group_df['whisker_high_limit']]\
+                      .groupby(group_col)['Price'].max().rename('Max')
+    stats = stats.merge(whisker_low, on=group_col, how='left')
+    stats = stats.merge(whisker_high, on=group_col, how='left')
+    group_df['is_outlier'] = (group_df['Price'] < group_df['whisker_low_limit']) | \
+                             (group_df['Price'] > group_df['whisker_high_limit'])
+    return stats, group_df
+
+def make_listings(n_rows, n_cities=45, seed=0):
+    """Random listings with the columns the boxplot charts group on."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "City": rng.choice([f"City {i}" for i in range(n_cities)], n_rows),
+        "Province": "Ontario",
+        "Number_Beds": rng.integers(0, 11, n_rows),
+        "Price": rng.lognormal(13.5, 0.6, n_rows).round(),
+    })
+
+def time_call(func, *args, repeat=5):
+    """Best wall-clock time of repeat calls, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case (best is reported).")
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'group':>12} {'reference ms':>14} {'vectorized ms':>14} {'speedup':>8}")
+    for n_rows in SIZES:
+        df = make_listings(n_rows)
+        for group_col in ("City", "Number_Beds"):
+            old = time_call(reference_compute_boxplot_stats, df, group_col, repeat=args.repeat)
+            new = time_call(compute_boxplot_stats, df, group_col, repeat=args.repeat)
+            print(f"{n_rows:>10} {group_col:>12} {old:>14.1f} {new:>14.1f} {old / new:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,402 @@
+"""
+Load-test the dashboard end to end by replaying the requests a browser makes.
+
+Starts the app under gunicorn (or targets --url) and runs a rising number of
+virtual users. Each user loads the page (/_dash-layout and the initial
+callbacks), then repeatedly interacts with the filters: picks a province,
+adds or removes a city, drags a slider handle or resets the filters. Like the
+Dash renderer, the harness reads the callback graph from /_dash-dependencies,
+fires every callback whose inputs changed, feeds each response back into the
+page state and fires the callbacks that depend on it, sending the callbacks
+of one round in parallel. Background callbacks are polled for their results
+at the interval the app sets.
+
+For each concurrency level it reports per-callback p50/p95/p99 latency,
+response sizes and errors, plus request and interaction throughput. The load
+generator shares the machine with the server, so compare runs made on the
+same host.
+
+Usage:
+    python -m benchmarks.load_test [--concurrency 1 2 4 8] [--duration S] [--workers N]
+                                   [--data-dir DIR] [--url URL] [--output FILE]
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Relative frequency of each user interaction
+INTERACTIONS = {
+    "province": 0.2,
+    "city_add": 0.25,
+    "city_remove": 0.2,
+    "slider": 0.25,
+    "reset": 0.05,
+    "reload": 0.05,
+}
+
+# Browsers send at most this many requests to one host at a time
+MAX_PARALLEL_REQUESTS = 6
+
+def prop_key(dependency):
+    """Return the "id.property" key of a dependency entry."""
+    return f"{dependency['id']}.{dependency['property']}"
+
+def parse_outputs(output):
+    """
+    Split a Dash output string into its (id, property) pairs.
+
+    Args:
+        output (str): "id.prop" or, for multiple outputs, "..id.prop...id.prop..".
+
+    Returns:
+        list: Tuples of (id, property).
+    """
+    parts = output[2:-2].split("...") if output.startswith("..") else [output]
+    return [tuple(part.rsplit(".", 1)) for part in parts]
+
+def collect_props(node, state):
+    """Record the props of every component with an id in a /_dash-layout tree."""
+    if isinstance(node, list):
+        for child in node:
+            collect_props(child, state)
+    elif isinstance(node, dict):
+        props = node.get("props", {})
+        if "id" in props and isinstance(props["id"], str):
+            for name, value in props.items():
+                state[f"{props['id']}.{name}"] = value
+        for value in props.values():
+            if isinstance(value, (dict, list)):
+                collect_props(value, state)
+
+class Recorder:
+    """Thread-safe collection of request timings for one concurrency level."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = defaultdict(list)  # name -> [(ms, bytes, ok)]
+        self.interactions = defaultdict(list)  # interaction -> [ms]
+
+    def request(self, name, ms, size, ok):
+        with self._lock:
+            self.requests[name].append((ms, size, ok))
+
+    def interaction(self, name, ms):
+        with self._lock:
+            self.interactions[name].append(ms)
+
+class VirtualUser:
+    """
+    One browser session: page state plus the Dash callback graph.
+
+    Args:
+        url (str): Base URL of the app.
+        dependencies (list): Callback definitions from /_dash-dependencies.
+        recorder (Recorder): Where timings are recorded.
+        seed (int): Random seed for this user's interactions.
+    """
+
+    def __init__(self, url, dependencies, recorder, seed):
+        self.url = url.rstrip("/")
+        self.dependencies = dependencies
+        self.recorder = recorder
+        self.rng = random.Random(seed)
+        self.state = {}
+        self.pool = ThreadPoolExecutor(MAX_PARALLEL_REQUESTS)
+
+    def fetch(self, name, path, payload=None):
+        """Send one request and record its latency and response size."""
+        data = json.dumps(payload).encode() if payload is not None else None
+        headers = {"Accept-Encoding": "gzip", **({"Content-Type": "application/json"} if data else {})}
+        request = urllib.request.Request(self.url + path, data=data, headers=headers)
+        start = time.perf_counter()
+        encoding = None
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                body = response.read()
+                status, encoding = response.status, response.headers.get("Content-Encoding")
+        except urllib.error.HTTPError as error:
+            body, status = error.read(), error.code
+        except OSError:
+            body, status = b"", None
+        ms = (time.perf_counter() - start) * 1000
+        ok = status is not None and status < 400
+        self.recorder.request(name, ms, len(body), ok)  # Bytes on the wire, as a browser receives them
+        return status, gzip.decompress(body) if encoding == "gzip" else body
+
+    def call(self, dependency, changed):
+        """Fire one callback with the current state; return the props it updated."""
+        outputs = [{"id": id_, "property": prop} for id_, prop in parse_outputs(dependency["output"])]
+        payload = {
+            "output": dependency["output"],
+            "outputs": outputs if dependency["output"].startswith("..") else outputs[0],
+            "inputs": [{**i, "value": self.state.get(prop_key(i))} for i in dependency["inputs"]],
+            "state": [{**s, "value": self.state.get(prop_key(s))} for s in dependency["state"]],
+            "changedPropIds": [prop_key(i) for i in dependency["inputs"] if prop_key(i) in changed],
+        }
+        status, body = self.fetch(dependency["output"], "/_dash-update-component", payload)
+        if status != 200:
+            return {}  # 204: PreventUpdate / no_update; errors are recorded
+        response = json.loads(body)
+        if "cacheKey" in response:
+            response = self.poll_job(dependency, payload, response)
+        updates = {}
+        for id_, props in response.get("response", {}).items():
+            for name, value in props.items():
+                updates[f"{id_}.{name}"] = value
+        return updates
+
+    def poll_job(self, dependency, payload, job):
+        """Poll a background callback job, as the renderer does, until it returns its result."""
+        path = f"/_dash-update-component?cacheKey={job['cacheKey']}&job={job['job']}"
+        interval = dependency.get("long", {}).get("interval", 1000) / 1000
+        deadline = time.perf_counter() + 60
+        while time.perf_counter() < deadline:
+            time.sleep(interval)
+            status, body = self.fetch(f"{dependency['output']} (poll)", path, payload)
+            if status != 200:
+                return {}
+            response = json.loads(body)
+            if "response" in response:
+                return response
+        return {}
+
+    def propagate(self, changed, initial=False):
+        """
+        Fire callbacks in dependency order until the page settles.
+
+        Args:
+            changed (set): Props changed by the user.
+            initial (bool): Page load: fire every callback that runs initially.
+        """
+        def triggered_by(props):
+            return {i for i, d in enumerate(self.dependencies)
+                    if any(prop_key(inp) in props for inp in d["inputs"])}
+
+        if initial:
+            pending = {i for i, d in enumerate(self.dependencies) if not d.get("prevent_initial_call")}
+            changed = {prop_key(inp) for i in pending for inp in self.dependencies[i]["inputs"]}
+        else:
+            pending = triggered_by(changed)
+        while pending:
+            # Hold back callbacks whose inputs another pending callback is about to change
+            produced = {i: {f"{id_}.{prop}" for id_, prop in parse_outputs(self.dependencies[i]["output"])}
+                        for i in pending}
+            ready = [i for i in pending
+                     if not any(prop_key(inp) in produced[j]
+                                for j in pending if j != i for inp in self.dependencies[i]["inputs"])]
+            ready = ready or list(pending)
+            results = list(self.pool.map(lambda i: self.call(self.dependencies[i], changed), ready))
+            updated = {}
+            for updates in results:
+                updated.update(updates)
+            self.state.update(updated)
+            changed = changed | set(updated)
+            pending = (pending - set(ready)) | triggered_by(set(updated))
+
+    def load_page(self):
+        """Fetch the layout and run the initial callbacks."""
+        status, body = self.fetch("_dash-layout", "/_dash-layout")
+        if status != 200:
+            return
+        self.state = {}
+        collect_props(json.loads(body), self.state)
+        self.propagate(set(), initial=True)
+
+    def interact(self):
+        """Perform one random filter interaction; return its name."""
+        name = self.rng.choices(list(INTERACTIONS), weights=list(INTERACTIONS.values()))[0]
+        state, rng = self.state, self.rng
+        cities = list(state.get("city-filter.value") or [])
+        if name == "province":
+            provinces = [o["value"] for o in state.get("province-filter.options", [])]
+            state["province-filter.value"] = rng.sample(provinces, rng.randint(1, min(2, len(provinces))))
+            changed = {"province-filter.value"}
+        elif name == "city_add":
+            options = [o["value"] for o in state.get("city-filter.options", []) if o["value"] not in cities]
+            if not options:
+                return None
+            state["city-filter.value"] = cities + [rng.choice(options)]
+            changed = {"city-filter.value"}
+        elif name == "city_remove":
+            if not cities:
+                return None
+            cities.remove(rng.choice(cities))
+            state["city-filter.value"] = cities
+            changed = {"city-filter.value"}
+        elif name == "slider":
+            # Range sliders update on mouseup, so a drag sends only its final value
+            slider = rng.choice(["bedrooms-slider", "bathrooms-slider"])
+            lo, hi = state[f"{slider}.min"], state[f"{slider}.max"]
+            low, high = sorted(rng.sample(range(lo, hi + 1), 2))
+            state[f"{slider}.value"] = [low, high]
+            changed = {f"{slider}.value"}
+        elif name == "reset":
+            state["reset-button.n_clicks"] = (state.get("reset-button.n_clicks") or 0) + 1
+            changed = {"reset-button.n_clicks"}
+        else:
+            self.load_page()
+            return name
+        self.propagate(changed)
+        return name
+
+    def run(self, deadline, think_time):
+        """Load the page, then interact until the deadline."""
+        start = time.perf_counter()
+        self.load_page()
+        self.recorder.interaction("reload", (time.perf_counter() - start) * 1000)
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            name = self.interact()
+            if name:
+                self.recorder.interaction(name, (time.perf_counter() - start) * 1000)
+            if think_time:
+                time.sleep(self.rng.expovariate(1 / think_time))
+        self.pool.shutdown()
+
+def summarize(recorder, users, elapsed):
+    """
+    Reduce one concurrency level's timings to percentiles and throughput.
+
+    Returns:
+        dict: Per-request and per-interaction statistics.
+    """
+    def stats(ms):
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        return {"count": len(ms), "p50_ms": p50, "p95_ms": p95, "p99_ms": p99}
+
+    requests = {}
+    for name, samples in sorted(recorder.requests.items()):
+        ms, sizes, ok = zip(*samples)
+        requests[name] = {**stats(ms), "errors": ok.count(False),
+                          "mean_bytes": float(np.mean(sizes)), "max_bytes": max(sizes)}
+    total = sum(r["count"] for r in requests.values())
+    interactions = {name: stats(ms) for name, ms in sorted(recorder.interactions.items())}
+    return {
+        "users": users,
+        "seconds": elapsed,
+        "requests_per_second": total / elapsed,
+        "interactions_per_second": sum(i["count"] for i in interactions.values()) / elapsed,
+        "requests": requests,
+        "interactions": interactions,
+    }
+
+def run_level(url, dependencies, users, duration, think_time, seed):
+    """Run `users` virtual users for `duration` seconds and summarize."""
+    recorder = Recorder()
+    start = time.perf_counter()
+    deadline = start + duration
+    threads = [threading.Thread(target=VirtualUser(url, dependencies, recorder, seed + n).run,
+                                args=(deadline, think_time), daemon=True) for n in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(recorder, users, time.perf_counter() - start)
+
+def print_level(level):
+    """Print one concurrency level as a table."""
+    print(f"\n{level['users']} users: {level['requests_per_second']:.1f} requests/s, "
+          f"{level['interactions_per_second']:.1f} interactions/s")
+    print(f"  {'request':<46} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'mean KB':>9} {'errors':>6}")
+    for name, r in level["requests"].items():
+        outputs = parse_outputs(name) if name.startswith("..") else [(name,)]
+        label = ".".join(outputs[0]) + (f" (+{len(outputs) - 1} outputs)" if len(outputs) > 1 else "")
+        print(f"  {label:<46} {r['count']:>6} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f} "
+              f"{r['mean_bytes'] / 1024:>9.1f} {r['errors']:>6}")
+    for name, r in level["interactions"].items():
+        print(f"  interaction: {name:<33} {r['count']:>6} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f}")
+
+def free_port():
+    """Return a TCP port that is currently free on localhost."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_server(workers, data_dir, log):
+    """
+    Start the app under gunicorn (with gunicorn.conf.py) and wait until it serves.
+
+    Args:
+        workers (int): Worker processes, or None for the config default.
+        data_dir (str): DATA_DIR for the server, or None.
+        log: File the server's output is written to.
+
+    Returns:
+        Tuple of (subprocess.Popen, base URL).
+    """
+    port = free_port()
+    command = [sys.executable, "-m", "gunicorn", "--bind", f"127.0.0.1:{port}"]
+    if workers:
+        command += ["--workers", str(workers)]
+    env = {**os.environ, **({"DATA_DIR": str(data_dir)} if data_dir else {})}
+    server = subprocess.Popen(command, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with status {server.returncode}; see {log.name}")
+        try:
+            with urllib.request.urlopen(url + "/_dash-dependencies", timeout=5):
+                return server, url
+        except OSError:
+            time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError(f"gunicorn did not start serving within 120 s; see {log.name}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="Numbers of concurrent virtual users to run, in order.")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds per concurrency level.")
+    parser.add_argument("--think-time", type=float, default=0,
+                        help="Mean seconds each user waits between interactions (0: none).")
+    parser.add_argument("--workers", type=int, help="Gunicorn workers (default: gunicorn.conf.py).")
+    parser.add_argument("--data-dir", help="DATA_DIR for the server, e.g. from benchmarks.synthetic.")
+    parser.add_argument("--url", help="Test an already running server instead of starting gunicorn.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    server, log = None, None
+    url = args.url
+    if not url:
+        log = tempfile.NamedTemporaryFile("w", prefix="load_test_gunicorn_", suffix=".log", delete=False)
+        server, url = start_server(args.workers, args.data_dir, log)
+        print(f"Started gunicorn at {url} (log: {log.name})")
+    try:
+        with urllib.request.urlopen(url + "/_dash-dependencies", timeout=30) as response:
+            dependencies = json.load(response)
+        levels = []
+        for users in args.concurrency:
+            levels.append(run_level(url, dependencies, users, args.duration, args.think_time, args.seed))
+            print_level(levels[-1])
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=30)
+            log.close()
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({"url": url, "workers": args.workers,
+                                                 "data_dir": args.data_dir, "levels": levels}, indent=2))
+        print(f"\nWrote results to {args.output}")
+
+if __name__ == "__main__":
+    main()
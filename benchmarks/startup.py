@@ -0,0 +1,82 @@
+"""
+Measure the cold-start import time of the dashboard and enforce a budget.
+
+Each run imports src.app in a fresh interpreter under `python -X importtime`
+(which includes loading the data and building the layout), and reads the
+cumulative time of src.app from its report. The benchmark fails when the
+median exceeds the budget, or when a chart backend that should only be
+imported on first use (LAZY_MODULES) is imported at startup.
+
+Usage:
+    python -m benchmarks.startup [--runs N] [--budget-ms MS]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Heavy modules the app must not import until a chart is first rendered
+LAZY_MODULES = ("altair", "plotly.express", "plotly.graph_objects", "vegafusion")
+
+DEFAULT_BUDGET_MS = float(os.environ.get("STARTUP_BUDGET_MS", "2000"))
+
+def measure_import(module="src.app"):
+    """
+    Import a module in a fresh interpreter and parse its -X importtime report.
+
+    Args:
+        module (str): Module to import.
+
+    Returns:
+        Tuple of (cumulative import time of the module in ms, set of imported module names).
+    """
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")]))}
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    imported, total_us = set(), None
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        if not cumulative.strip().isdigit():
+            continue  # The header line
+        imported.add(name)
+        if name == module:
+            total_us = int(cumulative)
+    if total_us is None:
+        raise RuntimeError(f"{module} missing from the importtime report")
+    return total_us / 1000, imported
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time (median is reported).")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="Maximum median import time (default: STARTUP_BUDGET_MS or 2000).")
+    args = parser.parse_args()
+
+    measure_import()  # Warm the bytecode and file caches
+    timings, eager = [], set()
+    for _ in range(args.runs):
+        ms, imported = measure_import()
+        timings.append(ms)
+        eager |= {m for m in LAZY_MODULES if m in imported}
+
+    median = statistics.median(timings)
+    print(f"src.app import: median {median:.0f} ms, min {min(timings):.0f} ms, max {max(timings):.0f} ms "
+          f"over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    failures = []
+    if median > args.budget_ms:
+        failures.append(f"median import time {median:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+    if eager:
+        failures.append(f"imported at startup instead of on first use: {', '.join(sorted(eager))}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
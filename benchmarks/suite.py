@@ -0,0 +1,185 @@
+"""
+Micro-benchmark the filtering, aggregation and chart callbacks on synthetic data.
+
+For each scale, synthetic listings (see benchmarks.synthetic) are swapped in as
+the dashboard's data context, and every benchmark runs over a few typical
+filter states:
+    - get_filtered_data: index lookup and row selection, uncached.
+    - compute_boxplot_stats: by City and by Number_Beds.
+    - aggregate: the shared per-filter aggregation stage, uncached.
+    - the bodies of the registered callbacks, with the aggregates cached as
+      they are after the filtered-data callback has run.
+
+Results are written as JSON; pass an earlier file to --compare to see the
+change per benchmark.
+
+Usage:
+    python -m benchmarks.suite [--scales 1 10 100] [--repeat N] [--output FILE] [--compare BASELINE]
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from dash import Dash
+
+from benchmarks.synthetic import generate_listings
+from src.callbacks import charts
+from src.utils.data_context import DataContext, get_data_context, set_data_context
+from src.utils.data_loader import load_data
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+SCENARIOS = {
+    "all": ([], [], [0, 10], [0, 10]),
+    "default": (["Vancouver", "Toronto", "Montreal", "Ottawa"], [], [0, 10], [0, 10]),
+    "province": ([], ["Ontario"], [0, 10], [0, 10]),
+    "narrow": (["Toronto"], [], [2, 3], [1, 2]),
+}
+
+CALLBACKS = {
+    "update_summary_stats": "..median-price.children...avg-bedrooms.children...avg-bathrooms.children...price-range.children..",
+    "update_chart1": "chart1.spec",
+    "update_chart2": "chart2.spec",
+    "update_chart3": "chart3.figure",
+    "update_map": "map.spec",
+}
+
+# Slowdown, relative to the baseline, reported as a regression by --compare
+REGRESSION_RATIO = 1.25
+
+def measure(func, repeat):
+    """
+    Time repeated calls of func.
+
+    Args:
+        func (callable): Zero-argument function to time.
+        repeat (int): Number of timed calls.
+
+    Returns:
+        dict: best_ms and median_ms.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"best_ms": min(timings), "median_ms": statistics.median(timings)}
+
+def callback_bodies():
+    """Register the chart callbacks on a bare app and return their undecorated functions."""
+    app = Dash(__name__)
+    charts.register_callbacks(app)
+    return {name: app.callback_map[output]["callback"].__wrapped__ for name, output in CALLBACKS.items()}
+
+def uncached(cache, func):
+    """Wrap func so every call starts from an empty cache."""
+    def call():
+        cache.clear()
+        return func()
+    return call
+
+def run_scale(scale, locations, housing, callbacks, repeat):
+    """
+    Run every benchmark on one synthetic dataset.
+
+    Args:
+        scale (int): Multiple of the real dataset's size.
+        locations (pd.DataFrame): Location table.
+        housing (pd.DataFrame): Real listings the synthetic ones are drawn from.
+        callbacks (dict): Callback bodies by name.
+        repeat (int): Timed calls per benchmark.
+
+    Returns:
+        list: One result dict per (benchmark, scenario).
+    """
+    context = DataContext(locations, generate_listings(housing, scale))
+    set_data_context(context)
+    results = []
+
+    def record(benchmark, scenario, func):
+        func()  # Warm-up: compiles templates and fills caches a cold call would not measure
+        results.append({"scale": scale, "rows": len(context.housing), "benchmark": benchmark,
+                        "scenario": scenario, **measure(func, repeat)})
+        print(f"{scale:>6}x {benchmark:<32} {scenario:<10} {results[-1]['best_ms']:>10.2f} ms")
+
+    for scenario, filters in SCENARIOS.items():
+        filter_args = charts.decode_filter_key(charts.encode_filter_key(*filters))
+        key = charts.encode_filter_key(*filters)
+        record("get_filtered_data", scenario,
+               uncached(context.filter_cache, lambda: charts.get_filtered_data(*filter_args, context=context)))
+        df = charts.get_filtered_data(*filter_args, context=context)
+        if df.empty:
+            continue
+        for group_col in ("City", "Number_Beds"):
+            record(f"compute_boxplot_stats[{group_col}]", scenario,
+                   lambda: charts.compute_boxplot_stats(df, group_col))
+        record("aggregate", scenario,
+               uncached(context.aggregate_cache, lambda: charts.compute_filter_aggregates(key, context)))
+        charts.get_filter_aggregates(key, context)
+        for name, body in callbacks.items():
+            record(name, scenario, lambda: body(key))
+    return results
+
+def git_commit():
+    """Return the current commit hash, or None outside a git checkout."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline_path):
+    """Print each benchmark's best time against a baseline results file."""
+    baseline = json.loads(Path(baseline_path).read_text())
+    previous = {(r["scale"], r["benchmark"], r["scenario"]): r["best_ms"] for r in baseline["results"]}
+    print(f"\nCompared with {baseline_path} ({baseline.get('commit')}):")
+    for r in results:
+        before = previous.get((r["scale"], r["benchmark"], r["scenario"]))
+        if before is None:
+            continue
+        ratio = r["best_ms"] / before if before else float("inf")
+        flag = "  REGRESSION" if ratio > REGRESSION_RATIO else ""
+        print(f"{r['scale']:>6}x {r['benchmark']:<32} {r['scenario']:<10} "
+              f"{before:>10.2f} -> {r['best_ms']:>10.2f} ms ({ratio:.2f}x){flag}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100],
+                        help="Dataset multiples to run (1000x needs several GB of memory).")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed calls per benchmark.")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/<commit>.json).")
+    parser.add_argument("--compare", help="Earlier results file to compare against.")
+    args = parser.parse_args()
+
+    locations, housing = load_data()
+    callbacks = callback_bodies()
+    original = get_data_context()
+    results = []
+    try:
+        for scale in args.scales:
+            results.extend(run_scale(scale, locations, housing, callbacks, args.repeat))
+    finally:
+        set_data_context(original)
+
+    commit = git_commit()
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{commit or 'results'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeat": args.repeat,
+        "results": results,
+    }, indent=2))
+    print(f"Wrote {len(results)} results to {output}")
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
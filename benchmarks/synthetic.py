@@ -0,0 +1,93 @@
+"""
+Generate synthetic housing listings at a multiple of the real dataset's size.
+
+Each location (City, Province) gets `scale` times its real number of
+listings. Listings are resampled from that location's real listings, so the
+per-city joint distribution of price, bedrooms and bathrooms is preserved,
+and prices get a small multiplicative jitter so larger scales do not just
+repeat the same values. Population and income stay per-city constants.
+
+Usage:
+    python -m benchmarks.synthetic --scale 10 --output-dir /tmp/housing_10x
+    DATA_DIR=/tmp/housing_10x gunicorn src.app:server
+"""
+import argparse
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.utils.data_loader import load_data, compact_dtypes, get_data_dir, HOUSING_FILE, LOCATIONS_FILE
+
+SCALES = (1, 10, 100, 1000)
+
+# Standard deviation of the log-price jitter applied to resampled listings
+PRICE_JITTER = 0.05
+
+def generate_listings(housing, scale, seed=0, price_jitter=PRICE_JITTER):
+    """
+    Resample listings per location at scale times the source size.
+
+    Args:
+        housing (pd.DataFrame): Source listings in the housing schema.
+        scale (int): Multiple of each location's listing count to generate.
+        seed (int): Random seed.
+        price_jitter (float): Standard deviation of the log-price noise.
+
+    Returns:
+        pd.DataFrame: Synthetic listings in the compact housing schema,
+        grouped by location in the source's location order.
+    """
+    rng = np.random.default_rng(seed)
+    codes, _ = pd.MultiIndex.from_arrays([housing["City"], housing["Province"]]).factorize()
+    order = np.argsort(codes, kind="stable")
+    counts = np.bincount(codes)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    # For every synthetic row, draw a source row from the same location
+    location = np.repeat(np.arange(len(counts)), counts * scale)
+    offsets = (rng.random(len(location)) * counts[location]).astype(np.int64)
+    rows = order[starts[location] + offsets]
+
+    synthetic = housing.iloc[rows].reset_index(drop=True)
+    if price_jitter and scale > 1:
+        price = synthetic["Price"].to_numpy(dtype=np.float64)
+        lo, hi = price.min(), price.max()
+        price = np.clip(price * np.exp(rng.normal(0, price_jitter, len(price))), lo, hi)
+        synthetic["Price"] = np.round(price, -2)  # Listings are priced in whole hundreds
+    return compact_dtypes(synthetic, f"synthetic {scale}x housing data")
+
+def write_dataset(output_dir, scale, seed=0, data_dir=None):
+    """
+    Write a synthetic processed-data directory usable as DATA_DIR.
+
+    Args:
+        output_dir (Path): Destination directory.
+        scale (int): Multiple of the real dataset's size.
+        seed (int): Random seed.
+        data_dir: Source processed-data directory (see get_data_dir).
+
+    Returns:
+        pd.DataFrame: The synthetic listings.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    _, housing = load_data(data_dir)
+    synthetic = generate_listings(housing, scale, seed)
+    synthetic.to_feather(output_dir / HOUSING_FILE)
+    shutil.copyfile(get_data_dir(data_dir) / LOCATIONS_FILE, output_dir / LOCATIONS_FILE)
+    return synthetic
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=int, default=10, help="Multiple of the real dataset's size.")
+    parser.add_argument("--output-dir", required=True, help="Directory to write the processed files to.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+    args = parser.parse_args()
+
+    synthetic = write_dataset(args.output_dir, args.scale, args.seed)
+    print(f"Wrote {len(synthetic):,} synthetic listings ({args.scale}x) to {args.output_dir}")
+
+if __name__ == "__main__":
+    main()
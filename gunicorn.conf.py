@@ -0,0 +1,48 @@
+"""
+Gunicorn settings for serving the dashboard.
+
+    gunicorn src.app:server        # picks up this file from the working directory
+
+The app is preloaded in the master, so the dataset and its indexes are built
+once and every worker starts from a forked copy that shares those pages
+copy-on-write. Standard overrides still apply (GUNICORN_CMD_ARGS, command-line
+flags); PORT, WEB_CONCURRENCY and LOG_LEVEL are read here for convenience.
+
+Each worker reloads the data when the processed files change (polled every
+DATA_RELOAD_INTERVAL seconds, if set) or when it receives SIGUSR2:
+
+    kill -USR2 <worker pids>    # not the master, where USR2 upgrades the binary
+
+Workers then precompute popular filter states in background threads (see
+WARMUP_STATES), on startup and after every reload.
+"""
+import gc
+import logging
+import multiprocessing
+import os
+
+wsgi_app = "src.app:server"
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", min(multiprocessing.cpu_count() * 2 + 1, 8)))
+preload_app = True
+loglevel = os.environ.get("LOG_LEVEL", "info").lower()
+
+# Application loggers (data loading, caches) report through the same stream as gunicorn
+logging.basicConfig(level=loglevel.upper(), format="[%(asctime)s] [%(process)d] [%(levelname)s] %(name)s: %(message)s")
+
+def when_ready(server):
+    """Freeze everything allocated while preloading before the first worker is forked."""
+    # Frozen objects are skipped by the garbage collector, so collections in the
+    # workers never write to (and un-share) the pages holding the preloaded data
+    gc.collect()
+    gc.freeze()
+    server.log.info("Froze %d objects from the preloaded app", gc.get_freeze_count())
+
+def post_worker_init(worker):
+    """Watch the processed data for changes and warm the caches in each worker."""
+    # Runs after the worker has installed its own signal handlers, which reset SIGUSR2
+    from src.app import app
+    from src.utils.data_context import start_reload_watcher
+    from src.utils.warmup import enable_warmup
+    enable_warmup(app)
+    start_reload_watcher()
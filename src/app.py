@@ -1,22 +1,40 @@
 from dash import Dash
 import dash_bootstrap_components as dbc
 from src.components.layout import create_layout
-from src.utils.data_loader import load_data
+from src.utils.data_context import get_data_context, start_reload_watcher
 from src.callbacks.filters import register_callbacks as register_filters_callbacks
 from src.callbacks.charts import register_callbacks as register_charts_callbacks
+from src.utils.metrics import register_metrics
+from src.utils.compression import register_compression
+from src.utils.warmup import enable_warmup
+from src.utils.profiling import register_profiling
 
-# Load the two separate DataFrames as global variables
-df_locations, df_housing = load_data()
+# Load the data once per process tree; under gunicorn --preload this runs in the master
+get_data_context()
 
 app = Dash(__name__, title="Canadian House Prices", external_stylesheets=[dbc.themes.BOOTSTRAP])
 server = app.server
 
-# Pass both DataFrames to the layout
-app.layout = create_layout(df_housing)
+def serve_layout():
+    """Build the layout from the current data, so reloaded data shows on the next page load."""
+    return create_layout(get_data_context().catalog)
 
-# Register callbacks, passing both DataFrames if needed
+app.layout = serve_layout
+
+# Register callbacks; they read the data from the shared context
 register_filters_callbacks(app)
 register_charts_callbacks(app)
 
+# Profile a sample of callback calls if PROFILE_SAMPLE_RATE or PROFILE_ALLOW_HEADER is set
+register_profiling(app)
+
+# Time every callback and serve Prometheus metrics at /metrics
+register_metrics(app)
+
+# Gzip callback and layout responses; the chart specs compress several-fold
+register_compression(app)
+
 if __name__ == "__main__":
-    app.run_server(debug=False)
\ No newline at end of file
+    enable_warmup(app)
+    start_reload_watcher()
+    app.run_server(debug=False)
@@ -1,22 +1,28 @@
+import os
 from dash import Output, Input
 from dash import html, dcc
+import numpy as np
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import altair as alt
-from src.utils.data_loader import load_data
-import requests  # For fetching GeoJSON data
-from functools import lru_cache
-
-# Load datasets once when the module is imported
-df_locations, df_housing = load_data()
+from src.utils.data_loader import GEOJSON_PATH
+from flask import request
+from src.utils.data_context import get_data_context
+from src.utils.spec_templates import SpecTemplate
+from src.utils.background import background_callback_options, get_aggregate_store
+import json
 
 # Define constants for chart styling
 CHART_AXIS_TITLE_FONT_SIZE = 18
 CHART_AXIS_TICKFONT_FONT_SIZE = 16
 
-# Enable vegafusion for better Altair performance with large datasets
-alt.data_transformers.enable("vegafusion")
+# Outlier marks drawn per boxplot group; extra outliers are thinned out (0 draws every one)
+OUTLIER_CAP = int(os.environ.get("OUTLIER_CAP", "50"))
+
+# Decimals sent to the browser per column; charts display prices in whole dollars,
+# bedroom averages to 2 places and coordinates at the source's precision
+DISPLAY_DECIMALS = {
+    "Price": 0, "Q1": 0, "median": 0, "Q3": 0, "Min": 0, "Max": 0,
+    "Number_Beds": 2, "Latitude": 4, "Longitude": 4, "Price_Income_Ratio": 3,
+}
 
 # Define a color mapping for Canadian provinces/territories
 PROVINCE_COLORS = {
@@ -35,71 +41,617 @@ PROVINCE_COLORS = {
     "Yukon": "#32CD32"                    # Lime
 }
 
-# Fetch GeoJSON data
-geojson_url = "https://raw.githubusercontent.com/codeforamerica/click_that_hood/master/public/data/canada.geojson"
-try:
-    response = requests.get(geojson_url)
-    response.raise_for_status()
-    geojson_data = response.json()
-except requests.exceptions.RequestException as e:
-    print(f"Error fetching GeoJSON: {e}")
-    geojson_data = {"features": []}  # Fallback to empty data
-
-@lru_cache(maxsize=1024)
+def get_base_map_url(app):
+    """
+    Return the versioned asset URL of the bundled province boundaries.
+
+    Args:
+        app: The Dash application instance serving the assets folder.
+
+    Returns:
+        str: URL with the file's modification time as a cache-busting query.
+    """
+    version = int(GEOJSON_PATH.stat().st_mtime) if GEOJSON_PATH.exists() else 0
+    return f"{app.get_asset_url(GEOJSON_PATH.name)}?m={version}"
+
 def get_filtered_data(selected_cities: tuple, selected_provinces: tuple, 
-                      bedrooms_range: tuple, bathrooms_range: tuple):
+                      bedrooms_range: tuple, bathrooms_range: tuple, context=None):
     """
-    Filter the global df_housing DataFrame based on the provided parameters.
+    Filter the housing dataset based on the provided parameters.
+
+    The matching row positions are resolved through the context's
+    precomputed index and kept in its filter_cache, so only the selected rows
+    are materialized and cached results cost a few bytes per row.
 
     Args:
         selected_cities: Tuple of selected cities.
         selected_provinces: Tuple of selected provinces.
         bedrooms_range: Tuple of (min, max) bedrooms.
         bathrooms_range: Tuple of (min, max) bathrooms.
+        context: DataContext to filter; defaults to the process-wide one.
 
     Returns:
         Filtered DataFrame.
     """
-    filtered_df = df_housing.copy()
-    if selected_cities:
-        filtered_df = filtered_df[filtered_df["City"].isin(selected_cities)]
-    if selected_provinces:
-        filtered_df = filtered_df[filtered_df["Province"].isin(selected_provinces)]
-    filtered_df = filtered_df[(filtered_df["Number_Beds"] >= bedrooms_range[0]) & 
-                              (filtered_df["Number_Beds"] <= bedrooms_range[1])]
-    filtered_df = filtered_df[(filtered_df["Number_Baths"] >= bathrooms_range[0]) & 
-                              (filtered_df["Number_Baths"] <= bathrooms_range[1])]
-    return filtered_df
+    context = context or get_data_context()
+    key = (selected_cities, selected_provinces, bedrooms_range, bathrooms_range)
+    positions = context.filter_cache.get_or_compute(key, lambda: context.index.filter(*key))
+    return context.housing.iloc[positions]
+
+def encode_filter_key(selected_cities, selected_provinces, bedrooms_range, bathrooms_range):
+    """
+    Build the compact filter-signature key held in the filtered-data store.
+
+    The key is a canonical JSON string of the filter state, so the browser only
+    round-trips a few hundred bytes and any worker can resolve it server-side.
+
+    Args:
+        selected_cities: List of selected cities (or None).
+        selected_provinces: List of selected provinces (or None).
+        bedrooms_range: (min, max) bedrooms.
+        bathrooms_range: (min, max) bathrooms.
+
+    Returns:
+        str: The filter-signature key.
+    """
+    return json.dumps([
+        sorted(selected_cities or []),
+        sorted(selected_provinces or []),
+        [int(v) for v in bedrooms_range],
+        [int(v) for v in bathrooms_range],
+    ], separators=(",", ":"))
+
+def decode_filter_key(key):
+    """
+    Decode a filter-signature key back into hashable filter arguments.
+
+    Args:
+        key: Key produced by encode_filter_key.
+
+    Returns:
+        Tuple of (cities, provinces, bedrooms_range, bathrooms_range) tuples.
+    """
+    return tuple(tuple(part) for part in json.loads(key))
+
+def resolve_filter_key(key):
+    """
+    Resolve a filter-signature key against the server-side result cache.
+
+    Args:
+        key: Key produced by encode_filter_key.
+
+    Returns:
+        Filtered DataFrame (shared with the cache, treat as read-only).
+    """
+    return get_filtered_data(*decode_filter_key(key))
 
 def compute_boxplot_stats(group_df, group_col):
     """
     Compute boxplot statistics (quartiles, whiskers, outliers) for a grouped column.
-    
+
+    Rows are sorted once by (group, Price); quartiles are then read directly
+    from group offsets with linear interpolation (as pandas' describe does),
+    and whisker endpoints and outlier flags come from one vectorized compare
+    against the per-group limits, with no row-level merge.
+
     Args:
         group_df: DataFrame to compute statistics on.
         group_col: Column name to group by.
-    
+
     Returns:
         Tuple of (stats DataFrame, DataFrame with outlier flags).
     """
-    stats = group_df.groupby(group_col)["Price"].describe().reset_index()
-    stats = stats.rename(columns={'25%': 'Q1', '50%': 'median', '75%': 'Q3'})
+    codes, groups = pd.factorize(group_df[group_col], sort=True)
+    price = group_df["Price"].to_numpy(dtype=np.float64)
+    # Sort by price, then stable-sort by group code (a radix sort for small integer codes)
+    order = np.argsort(price)
+    code_dtype = np.int16 if len(groups) < np.iinfo(np.int16).max else np.int64
+    order = order[np.argsort(codes[order].astype(code_dtype), kind="stable")]
+    order = order[codes[order] >= 0]  # Like groupby, drop rows with a missing group key
+    sorted_codes, sorted_price = codes[order], price[order]
+
+    starts = np.searchsorted(sorted_codes, np.arange(len(groups)))
+    counts = np.diff(np.append(starts, len(sorted_codes)))
+    groups, starts, counts = groups[counts > 0], starts[counts > 0], counts[counts > 0]
+    last = starts + counts - 1
+
+    def quantile(q):
+        position = starts + q * (counts - 1)
+        low = np.floor(position).astype(np.int64)
+        high = np.minimum(low + 1, last)
+        return sorted_price[low] + (sorted_price[high] - sorted_price[low]) * (position - low)
+
+    sums = np.add.reduceat(sorted_price, starts)
+    mean = sums / counts
+    group_of_row = np.repeat(np.arange(len(groups)), counts)
+    squared_dev = np.add.reduceat((sorted_price - mean[group_of_row]) ** 2, starts)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        std = np.where(counts > 1, np.sqrt(squared_dev / (counts - 1)), np.nan)
+
+    stats = pd.DataFrame({
+        group_col: groups, "count": counts.astype(np.float64), "mean": mean, "std": std,
+        "min": sorted_price[starts], "Q1": quantile(0.25), "median": quantile(0.5),
+        "Q3": quantile(0.75), "max": sorted_price[last],
+    })
     stats['IQR'] = stats['Q3'] - stats['Q1']
     stats['whisker_low_limit'] = stats['Q1'] - 1.5 * stats['IQR']
     stats['whisker_high_limit'] = stats['Q3'] + 1.5 * stats['IQR']
 
-    group_df = group_df.merge(stats[[group_col, 'whisker_low_limit', 'whisker_high_limit']], 
-                             on=group_col, how='left')
-    whisker_low = group_df[group_df['Price'] >= group_df['whisker_low_limit']]\
-                     .groupby(group_col)['Price'].min().rename('Min')
-    whisker_high = group_df[group_df['Price'] <= group_df['whisker_high_limit']]\
-                      .groupby(group_col)['Price'].max().rename('Max')
-    stats = stats.merge(whisker_low, on=group_col, how='left')
-    stats = stats.merge(whisker_high, on=group_col, how='left')
+    low_limit = stats['whisker_low_limit'].to_numpy()[group_of_row]
+    high_limit = stats['whisker_high_limit'].to_numpy()[group_of_row]
+    above_low, below_high = sorted_price >= low_limit, sorted_price <= high_limit
+    stats['Min'] = np.minimum.reduceat(np.where(above_low, sorted_price, np.inf), starts)
+    stats['Max'] = np.maximum.reduceat(np.where(below_high, sorted_price, -np.inf), starts)
+
+    # Scatter the per-row results from sorted order back to the input row order
+    row_low = np.full(len(price), np.nan)
+    row_high = np.full(len(price), np.nan)
+    is_outlier = np.zeros(len(price), dtype=bool)
+    row_low[order], row_high[order] = low_limit, high_limit
+    is_outlier[order] = ~(above_low & below_high)
+    group_df = group_df.assign(whisker_low_limit=row_low, whisker_high_limit=row_high,
+                               is_outlier=is_outlier)
+    return stats, group_df
+
+def compute_sketch_boxplot_stats(group_df, group_col, filter_args, sketches):
+    """
+    Approximate counterpart of compute_boxplot_stats backed by quantile sketches.
+
+    Quartiles and whisker endpoints come from merging the quantile sketches of
+    the cells in the filter state; rows are only compared against the whisker
+    limits to flag outliers.
+
+    Args:
+        group_df: Filtered DataFrame matching filter_args.
+        group_col: Column name to group by ("City" or "Number_Beds").
+        filter_args: Tuple of (cities, provinces, bedrooms_range, bathrooms_range).
+        sketches: QuantileSketchSet of the dataset group_df was filtered from.
+
+    Returns:
+        Tuple of (stats DataFrame, DataFrame with outlier flags).
+    """
+    cells = sketches.layout.select_cells(*filter_args)
+    stats = sketches.boxplot_stats(cells, group_col)
+    limits = stats.set_index(group_col)
+    group_df = group_df.assign(
+        whisker_low_limit=group_df[group_col].map(limits["whisker_low_limit"]).astype(np.float64),
+        whisker_high_limit=group_df[group_col].map(limits["whisker_high_limit"]).astype(np.float64),
+    )
     group_df['is_outlier'] = (group_df['Price'] < group_df['whisker_low_limit']) | \
                              (group_df['Price'] > group_df['whisker_high_limit'])
     return stats, group_df
 
+def downsample_outliers(outliers, group_col, cap=OUTLIER_CAP):
+    """
+    Keep at most cap outliers per group, always including each group's extremes.
+
+    Within a group that exceeds the cap, outliers are ranked by price and
+    cap evenly spaced ranks are kept, which always includes the lowest and
+    highest price and keeps the spread of the rest. The choice depends only
+    on the data, so the same filter state always draws the same points.
+
+    Args:
+        outliers: DataFrame of outlier rows with group_col and Price.
+        group_col: Column the boxplot groups by.
+        cap (int): Maximum outliers kept per group (at least 2); 0 keeps all.
+
+    Returns:
+        DataFrame: The kept rows, ordered by group and price, with an
+        "elided" column counting the group's outliers that were dropped.
+    """
+    if outliers.empty or not cap:
+        return outliers.assign(elided=np.zeros(len(outliers), dtype=np.int64))
+    cap = max(cap, 2)
+    codes, _ = pd.factorize(outliers[group_col], sort=True)
+    order = np.lexsort((outliers["Price"].to_numpy(), codes))
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    counts = np.diff(np.r_[starts, len(order)])
+
+    keep = np.repeat(counts <= cap, counts)
+    for start, count in zip(starts[counts > cap], counts[counts > cap]):
+        keep[start + np.round(np.linspace(0, count - 1, cap)).astype(np.int64)] = True
+    elided = np.repeat(counts - np.minimum(counts, cap), counts)
+    return outliers.iloc[order[keep]].assign(elided=elided[keep])
+
+def get_boxplot_stats(group_df, group_col, key, context):
+    """
+    Compute boxplot statistics for a filter state, approximately when APPROX_QUANTILES is set.
+
+    Args:
+        group_df: Filtered DataFrame resolved from key.
+        group_col: Column name to group by.
+        key: Filter-signature key of group_df.
+        context: DataContext group_df was filtered from.
+
+    Returns:
+        Tuple of (stats DataFrame, DataFrame with outlier flags).
+    """
+    if context.sketches is not None:
+        return compute_sketch_boxplot_stats(group_df, group_col, decode_filter_key(key), context.sketches)
+    return compute_boxplot_stats(group_df, group_col)
+
+def compute_filter_aggregates(key, context):
+    """
+    Compute every aggregate the dashboard outputs need for one filter state.
+
+    The filtered rows are resolved once and each grouping (by city, by
+    city and province, by bedrooms) runs once, with results already shaped
+    for the output that consumes them.
+
+    Args:
+        key: Filter-signature key produced by encode_filter_key.
+        context: DataContext to aggregate.
+
+    Returns:
+        dict: count, summary (card values), city_stats, city_outliers,
+        bedroom_stats and bedroom_outliers (chart records), city_ratios
+        (DataFrame for the bubble chart) and map_markers (records). Only count
+        is set when nothing matches.
+    """
+    filter_args = decode_filter_key(key)
+    summary = context.cube.summarize(*filter_args)
+    if summary["count"] == 0:
+        return {"count": 0}
+    df = get_filtered_data(*filter_args, context=context)
+
+    # Summary cards: means and bounds from the cube, median from sketches or rows
+    sketches = context.sketches
+    if sketches is not None:
+        summary["median_price"] = sketches.quantile(sketches.layout.select_cells(*filter_args), 0.5)
+    else:
+        summary["median_price"] = df["Price"].median()
+
+    # Chart 1: city boxplots colored by province and ordered by median price
+    stats_city, outliers_city = get_boxplot_stats(df, "City", key, context)
+    city_province_map = df[["City", "Province"]].drop_duplicates()
+    stats_city = stats_city.merge(city_province_map, on="City", how="left")
+    sorted_cities = stats_city.sort_values("median", kind="stable")["City"].drop_duplicates()
+    city_order = pd.Series(np.arange(len(sorted_cities)), index=sorted_cities.to_numpy())
+    stats_city["order"] = stats_city["City"].map(city_order).astype(np.int64)
+    outliers_city = downsample_outliers(outliers_city[outliers_city["is_outlier"]], "City")
+    outliers_city = outliers_city.assign(order=outliers_city["City"].map(city_order).astype(np.int64))
+
+    # Chart 2: bedroom boxplots
+    stats_bedrooms, outliers_bedrooms = get_boxplot_stats(df, "Number_Beds", key, context)
+    outliers_bedrooms = downsample_outliers(outliers_bedrooms[outliers_bedrooms["is_outlier"]], "Number_Beds")
+
+    # Chart 3: price-to-income ratio per city
+    city_ratios = df.groupby("City", observed=True).agg({
+        "Price": "median", "Median_Family_Income": "median", "Population": "first", "Province": "first"
+    }).reset_index()
+    city_ratios["Price_Income_Ratio"] = city_ratios["Price"] / city_ratios["Median_Family_Income"]
+    city_ratios = round_for_display(city_ratios[["City", "Province", "Population", "Price", "Price_Income_Ratio"]])
+
+    # Map: one marker per (City, Province) location
+    agg_df = df.groupby(["City", "Province"], observed=True).agg({
+        "Price": "median", "Number_Beds": "mean"
+    }).reset_index()
+    map_df = pd.merge(agg_df, context.locations, on=["City", "Province"], how="left")
+
+    return {
+        "count": summary["count"],
+        "summary": summary,
+        "city_stats": to_records(stats_city, ["City", "Province", "order", "Q1", "median", "Q3", "Min", "Max"]),
+        "city_outliers": to_records(outliers_city, ["City", "Province", "order", "Price", "elided"]),
+        "bedroom_stats": to_records(stats_bedrooms, ["Number_Beds", "Q1", "median", "Q3", "Min", "Max"]),
+        "bedroom_outliers": to_records(outliers_bedrooms, ["Number_Beds", "Price", "elided"]),
+        "city_ratios": city_ratios,
+        "map_markers": to_records(map_df, ["City", "Price", "Number_Beds", "Latitude", "Longitude"]),
+    }
+
+def get_filter_aggregates(key, context=None):
+    """
+    Return the aggregates of a filter state, computing them once per worker.
+
+    Every output callback reads from the context's aggregate_cache, and
+    concurrent callbacks for the same key wait for a single computation
+    (or shared-store read, see fetch_filter_aggregates) instead of repeating it.
+
+    Args:
+        key: Filter-signature key produced by encode_filter_key.
+        context: DataContext to aggregate; defaults to the process-wide one.
+
+    Returns:
+        dict: See compute_filter_aggregates.
+    """
+    context = context or get_data_context()
+    return context.aggregate_cache.get_or_compute(key, lambda: fetch_filter_aggregates(key, context))
+
+def fetch_filter_aggregates(key, context):
+    """
+    Read a filter state's aggregates from the shared store, computing them on a miss.
+
+    With BACKGROUND_CALLBACKS on, the aggregates are computed by a
+    background job in its own process and handed to the workers through
+    the on-disk store (see get_aggregate_store); otherwise, and for contexts
+    not read from files, they are always computed here.
+
+    Args:
+        key: Filter-signature key produced by encode_filter_key.
+        context: DataContext to aggregate.
+
+    Returns:
+        dict: See compute_filter_aggregates.
+    """
+    store = get_aggregate_store() if context.version is not None else None
+    if store is None:
+        return compute_filter_aggregates(key, context)
+    # The data files' version is part of the key, so a reload never reads stale aggregates
+    store_key = (str(context.data_dir), context.version, key)
+    aggregates = store.get(store_key)
+    if aggregates is None:
+        aggregates = compute_filter_aggregates(key, context)
+        store.set(store_key, aggregates)
+    return aggregates
+
+def round_for_display(df):
+    """
+    Round float columns to their DISPLAY_DECIMALS before serialization.
+
+    Whole-dollar columns become integers so they serialize without a
+    fraction, and float32 columns become float64 so the rounded values
+    serialize without float32 noise digits.
+
+    Args:
+        df (pd.DataFrame): Table about to be sent to the browser.
+
+    Returns:
+        pd.DataFrame: A copy with the rounded columns.
+    """
+    rounded = {}
+    for column, decimals in DISPLAY_DECIMALS.items():
+        if column in df.columns and pd.api.types.is_float_dtype(df[column]):
+            values = df[column].astype(np.float64).round(decimals)
+            rounded[column] = values.astype(np.int64) if decimals == 0 and values.notna().all() else values
+    return df.assign(**rounded) if rounded else df
+
+def to_records(df, columns):
+    """Convert the given columns of a DataFrame to a list of JSON-ready records, rounded for display."""
+    return round_for_display(df[columns]).to_dict("records")
+
+def slim_plotly_template(fig):
+    """
+    Drop the template's trace defaults for trace types the figure does not use.
+
+    Plotly embeds the whole template in every figure; its per-trace-type
+    defaults (heatmaps, 3D, maps, ...) make up most of a small figure's JSON.
+
+    Args:
+        fig (go.Figure): Figure to slim in place.
+
+    Returns:
+        go.Figure: The same figure.
+    """
+    used = {trace.type for trace in fig.data}
+    template = fig.layout.template
+    fig.layout.template = {
+        "layout": template.layout,
+        "data": {kind: getattr(template.data, kind) for kind in used if getattr(template.data, kind, None)},
+    }
+    return fig
+
+BOX_TOOLTIP = ["Max", "Q3", "median", "Q1", "Min"]
+
+# Outlier tooltip line telling how many of the group's outliers were thinned out
+OUTLIER_ELIDED_TOOLTIP = {"field": "elided", "type": "quantitative", "title": "Similar outliers not drawn", "format": ","}
+
+def province_color():
+    """Province color encoding shared by chart1 layers and the map."""
+    import altair as alt
+
+    return alt.Color("Province:N", scale=alt.Scale(domain=list(PROVINCE_COLORS.keys()), range=list(PROVINCE_COLORS.values())), legend=None)
+
+def box_tooltip(label):
+    """Tooltip listing the boxplot statistics of a group."""
+    import altair as alt
+
+    return [label] + [alt.Tooltip(f"{field}:Q", format="$,.0f") for field in BOX_TOOLTIP]
+
+def fit_to_container(spec):
+    """Make a compiled chart spec fill its Vega component."""
+    spec["autosize"] = {"type": "fit", "contains": "padding"}
+    return spec
+
+def build_empty_chart(title):
+    """
+    Build the "No Data Available" placeholder chart.
+
+    Args:
+        title: Title of the chart being replaced.
+
+    Returns:
+        alt.Chart: A text-only chart.
+    """
+    import altair as alt
+
+    # Create a dummy DataFrame with one row
+    dummy_df = pd.DataFrame({"placeholder": [0]})
+    return alt.Chart(dummy_df).mark_text(
+        size=20,
+        align="center",
+        baseline="middle",
+        fontWeight="bold"  # Make the text bold
+    ).encode(
+        text=alt.value("No Data Available for Selected Filters"),
+        # Remove explicit x and y encodings to let align and baseline center it naturally
+    ).properties(
+        width="container",
+        height="container",
+        title=title
+    ).configure_title(
+        fontSize=25, font="Roboto, sans-serif", color="#000000", anchor="middle"
+    ).configure_view(strokeWidth=0)
+
+def build_chart1():
+    """
+    Build the City Price Distribution chart over named placeholder datasets.
+
+    Datasets:
+        stats: One row per city with City, Province, order, Q1, median, Q3, Min and Max.
+        outliers: One row per drawn outlier with City, Province, order, Price and
+            elided (outliers of the city not drawn, see downsample_outliers).
+
+    Returns:
+        alt.LayerChart: The configured chart.
+    """
+    import altair as alt
+
+    stats, outliers = alt.Data(name="stats"), alt.Data(name="outliers")
+    # Cities are ordered by median price through the per-row "order" field
+    x_encoding = alt.X("City:N", scale=alt.Scale(paddingInner=0.5), title="City",
+                       sort=alt.EncodingSortField(field="order", op="min"))
+
+    BAR_WIDTH = 30
+
+    # Box plot with province-based coloring
+    box = alt.Chart(stats).mark_bar(size=BAR_WIDTH).encode(
+        x=x_encoding, y=alt.Y("Q1:Q", title="Price"), y2="Q3:Q",
+        color=province_color(), tooltip=box_tooltip("City:N")
+    )
+
+    # Median tick
+    median = alt.Chart(stats).mark_tick(color="white", size=BAR_WIDTH).encode(
+        x=x_encoding, y="median:Q", tooltip=box_tooltip("City:N")
+    )
+
+    # Whiskers with province-based colors
+    whiskers = (
+        alt.Chart(stats).mark_rule().encode(
+            x=x_encoding, y="Min:Q", y2="Q1:Q", color=province_color(),
+            tooltip=["City:N", alt.Tooltip("Min:Q", format="$,.0f")]
+        ) +
+        alt.Chart(stats).mark_rule().encode(
+            x=x_encoding, y="Q3:Q", y2="Max:Q", color=province_color(),
+            tooltip=["City:N", alt.Tooltip("Max:Q", format="$,.0f")]
+        )
+    )
+
+    # Outliers with province-based colors
+    outlier_points = alt.Chart(outliers).mark_circle(size=60, stroke="black", strokeWidth=1).encode(
+        x=x_encoding, y="Price:Q", color=province_color(),
+        tooltip=["City:N", alt.Tooltip("Price:Q", format="$,.0f"), OUTLIER_ELIDED_TOOLTIP]
+    )
+
+    return (whiskers + box + median + outlier_points).properties(
+        width="container", height="container", title="City Price Distribution"
+    ).configure_title(fontSize=25, font="Roboto, sans-serif", color="#000000", anchor="middle"
+    ).configure_axis(labelFontSize=CHART_AXIS_TICKFONT_FONT_SIZE, titleFontSize=CHART_AXIS_TITLE_FONT_SIZE
+    ).configure_view(strokeWidth=0)
+
+def build_chart2():
+    """
+    Build the Price vs Number of Bedrooms chart over named placeholder datasets.
+
+    Datasets:
+        stats: One row per bedroom count with Number_Beds, Q1, median, Q3, Min and Max.
+        outliers: One row per drawn outlier with Number_Beds, Price and elided.
+
+    Returns:
+        alt.LayerChart: The configured chart.
+    """
+    import altair as alt
+
+    stats, outliers = alt.Data(name="stats"), alt.Data(name="outliers")
+    x_encoding = alt.X("Number_Beds:N", scale=alt.Scale(paddingInner=0.5), title="Number of Bedrooms")
+
+    box_color = "#4682b4"
+
+    # Box plot with fixed color
+    box = alt.Chart(stats).mark_bar().encode(
+        x=x_encoding, y=alt.Y("Q1:Q", title="Price"), y2="Q3:Q",
+        color=alt.value(box_color), tooltip=box_tooltip("No. of Beds:N")
+    )
+
+    # Median tick
+    median = alt.Chart(stats).mark_tick(color="white", size=20).encode(
+        x=x_encoding, y="median:Q", tooltip=box_tooltip("No. of Beds:N")
+    )
+
+    # Whiskers with the same fixed color
+    whiskers = (
+        alt.Chart(stats).mark_rule().encode(
+            x=x_encoding, y="Min:Q", y2="Q1:Q", color=alt.value(box_color),
+            tooltip=["No. of Beds:N", alt.Tooltip("Min:Q", format="$,.0f")]
+        ) +
+        alt.Chart(stats).mark_rule().encode(
+            x=x_encoding, y="Q3:Q", y2="Max:Q", color=alt.value(box_color),
+            tooltip=["No. of Beds:N", alt.Tooltip("Max:Q", format="$,.0f")]
+        )
+    )
+
+    # Outliers with the same fixed color
+    outlier_points = alt.Chart(outliers).mark_point().encode(
+        x=x_encoding, y="Price:Q", color=alt.value(box_color),
+        tooltip=["Number_Beds:N", alt.Tooltip("Price:Q", format="$,.0f"), OUTLIER_ELIDED_TOOLTIP]
+    )
+
+    return (whiskers + box + median + outlier_points).properties(
+        width="container", height="container", title="Price vs Number of Bedrooms"
+    ).configure_title(fontSize=25, font="Roboto, sans-serif", color="#000000", anchor="middle"
+    ).configure_axis(labelFontSize=CHART_AXIS_TICKFONT_FONT_SIZE, titleFontSize=CHART_AXIS_TITLE_FONT_SIZE
+    ).configure_view(strokeWidth=0)
+
+def build_map(base_map_url):
+    """
+    Build the province map over a named placeholder dataset of city markers.
+
+    The province boundaries are referenced by URL, so the browser loads them
+    once from the static assets instead of receiving them in every spec.
+
+    Args:
+        base_map_url: URL of the bundled province GeoJSON.
+
+    Datasets:
+        markers: One row per city with City, Price, Number_Beds, Latitude and Longitude.
+
+    Returns:
+        alt.LayerChart: The configured chart.
+    """
+    import altair as alt
+
+    base_map = alt.Chart(alt.Data(url=base_map_url, format=alt.DataFormat(type="json", property="features"))).mark_geoshape(stroke='white').project(
+        'transverseMercator', rotate=[90, 0, 0]
+    ).encode(
+        tooltip=alt.Tooltip('properties.name:N', title="Province"),
+        color=alt.Color('properties.name:N', scale=alt.Scale(domain=list(PROVINCE_COLORS.keys()), range=list(PROVINCE_COLORS.values())), legend=None),
+    )
+
+    city_markers = alt.Chart(alt.Data(name="markers")).mark_point(
+        shape='triangle-down',
+        filled=True,
+        opacity=1,          # Low opacity for semi-transparency
+    ).encode(
+        longitude='Longitude:Q',
+        latitude='Latitude:Q',
+        color=alt.Color('Price:Q', scale=alt.Scale(scheme='sinebow')),  # More visible color scheme
+        size=alt.Size('Price:Q', scale=alt.Scale(range=[50, 500])),
+        tooltip=["City:N",
+                 alt.Tooltip('Price:Q', title="Median Price", format=",.0f"),
+                 alt.Tooltip('Number_Beds:Q', title="Average Bedrooms", format=".2f")]
+    )
+
+    return (base_map + city_markers).properties(
+        width="container", height="container", title="Map of Canadian Provinces with Selected Cities"
+    ).configure_title(fontSize=25, font='Roboto, sans-serif', color="#000000", anchor='middle')
+
+def build_empty_map():
+    """Build the "No Data Available" placeholder map."""
+    import altair as alt
+
+    return alt.Chart(pd.DataFrame({"placeholder": [0]})).mark_text().encode(
+        text=alt.value("No Data Available")
+    ).properties(
+        title="Map of Canadian Provinces", width=600, height=400
+    )
+
+# Vega specs are compiled once and only their datasets change per update
+CHART1_TEMPLATE = SpecTemplate(build_chart1, finalize=fit_to_container)
+CHART2_TEMPLATE = SpecTemplate(build_chart2, finalize=fit_to_container)
+EMPTY_CHART1_SPEC = SpecTemplate(lambda: build_empty_chart("City Price Distribution"))
+EMPTY_CHART2_SPEC = SpecTemplate(lambda: build_empty_chart("Price vs Number of Bedrooms"))
+EMPTY_MAP_SPEC = SpecTemplate(build_empty_map)
+
 def register_callbacks(app):
     """
     Register callbacks for the Dash application to update the dashboard
@@ -108,22 +660,34 @@ def register_callbacks(app):
     Args:
         app: The Dash application instance.
     """
+    # The versioned base-map URL changes whenever the asset does, so browsers may cache it indefinitely
+    base_map_url = get_base_map_url(app)
+    map_template = SpecTemplate(lambda: build_map(base_map_url))
+
+    @app.server.after_request
+    def cache_base_map(response):
+        if request.path == base_map_url.split("?")[0] and response.status_code == 200:
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
     # Callback 1: Update filtered data store
+    # With BACKGROUND_CALLBACKS set, it runs as a background job, so the aggregation of a
+    # large selection never holds a worker; the output callbacks below only render
     @app.callback(
         Output('filtered-data', 'data'),
         [Input('city-filter', 'value'),
          Input('province-filter', 'value'),
          Input('bedrooms-slider', 'value'),
-         Input('bathrooms-slider', 'value')]
+         Input('bathrooms-slider', 'value')],
+        **background_callback_options()
     )
     def update_filtered_data(selected_cities, selected_provinces, bedrooms_range, bathrooms_range):
-        selected_cities_tuple = tuple(selected_cities) if selected_cities else tuple()
-        selected_provinces_tuple = tuple(selected_provinces) if selected_provinces else tuple()
-        bedrooms_range_tuple = tuple(bedrooms_range)
-        bathrooms_range_tuple = tuple(bathrooms_range)
-        filtered_df = get_filtered_data(selected_cities_tuple, selected_provinces_tuple, 
-                                        bedrooms_range_tuple, bathrooms_range_tuple)
-        return filtered_df.to_dict('records')
+        # Only the filter-signature key goes to the browser; rows stay in the server-side cache
+        # Aggregating here warms the shared cache before the output callbacks fan out
+        key = encode_filter_key(selected_cities, selected_provinces, bedrooms_range, bathrooms_range)
+        if get_filter_aggregates(key)["count"] == 0:
+            return None
+        return key
 
     # Callback 2: Update summary statistics
     @app.callback(
@@ -142,12 +706,12 @@ def register_callbacks(app):
             )
             return [no_data_message, no_data_message, no_data_message, no_data_message]
 
-        df = pd.DataFrame(data)
-        median_price = df["Price"].median()
-        avg_bedrooms = df["Number_Beds"].mean()
-        avg_bathrooms = df["Number_Baths"].mean()
-        min_price = df["Price"].min()
-        max_price = df["Price"].max()
+        summary = get_filter_aggregates(data)["summary"]
+        median_price = summary["median_price"]
+        avg_bedrooms = summary["avg_bedrooms"]
+        avg_bathrooms = summary["avg_bathrooms"]
+        min_price = summary["min_price"]
+        max_price = summary["max_price"]
         return [
             html.Div([html.H5("Median Price", style={"margin": "0", "color": "#FFFFFF"}), 
                       html.H3(f"${median_price:,.0f}", style={"margin": "0", "color": "#1E88E5"})]),
@@ -166,88 +730,10 @@ def register_callbacks(app):
     )
     def update_chart1(data):
         if not data:
-            # Create a dummy DataFrame with one row
-            dummy_df = pd.DataFrame({"placeholder": [0]})
-            chart = alt.Chart(dummy_df).mark_text(
-                size=20, 
-                align="center", 
-                baseline="middle",
-                fontWeight="bold"  # Make the text bold
-            ).encode(
-                text=alt.value("No Data Available for Selected Filters"),
-                # Remove explicit x and y encodings to let align and baseline center it naturally
-            ).properties(
-                width="container",
-                height="container",
-                title="City Price Distribution"
-            ).configure_title(
-                fontSize=25, font="Roboto, sans-serif", color="#000000", anchor="middle"
-            ).configure_view(strokeWidth=0)
-            return chart.to_dict(format="vega")
+            return EMPTY_CHART1_SPEC.spec
 
-        
-        df = pd.DataFrame(data)
-        stats_city, outliers_city = compute_boxplot_stats(df, "City")
-
-
-        city_medians = df.groupby("City")["Price"].median().sort_values()
-        sorted_cities = city_medians.index.tolist()
-        x_encoding = alt.X("City:N", scale=alt.Scale(paddingInner=0.5), title="City", sort=sorted_cities)
-        
-        # Merge province data into stats_city for color mapping (keep this)
-        city_province_map = df[["City", "Province"]].drop_duplicates()
-        stats_city = stats_city.merge(city_province_map, on="City", how="left")
-        # Do NOT merge into outliers_city; it already has Province from df
-
-        BAR_WIDTH = 30
-
-        # Box plot with province-based coloring
-        box = alt.Chart(stats_city).mark_bar(size=BAR_WIDTH).encode(
-            x=x_encoding, y=alt.Y("Q1:Q", title="Price"), y2="Q3:Q",
-            color=alt.Color("Province:N", scale=alt.Scale(domain=list(PROVINCE_COLORS.keys()), range=list(PROVINCE_COLORS.values())), legend=None),
-            tooltip=["City:N", alt.Tooltip("Max:Q", format="$,.0f"), alt.Tooltip("Q3:Q", format="$,.0f"),
-                     alt.Tooltip("median:Q", format="$,.0f"), alt.Tooltip("Q1:Q", format="$,.0f"),
-                     alt.Tooltip("Min:Q", format="$,.0f")]
-        )
-        
-        # Median tick
-        median = alt.Chart(stats_city).mark_tick(color="white", size=BAR_WIDTH).encode(
-            x=x_encoding, y="median:Q",
-            tooltip=["City:N", alt.Tooltip("Max:Q", format="$,.0f"), alt.Tooltip("Q3:Q", format="$,.0f"),
-                     alt.Tooltip("median:Q", format="$,.0f"), alt.Tooltip("Q1:Q", format="$,.0f"),
-                     alt.Tooltip("Min:Q", format="$,.0f")]
-        )
-        
-        # Whiskers with province-based colors
-        whiskers = (
-            alt.Chart(stats_city).mark_rule().encode(
-                x=x_encoding, y="Min:Q", y2="Q1:Q",
-                color=alt.Color("Province:N", scale=alt.Scale(domain=list(PROVINCE_COLORS.keys()), range=list(PROVINCE_COLORS.values())), legend=None),
-                tooltip=["City:N", alt.Tooltip("Min:Q", format="$,.0f")]
-            ) +
-            alt.Chart(stats_city).mark_rule().encode(
-                x=x_encoding, y="Q3:Q", y2="Max:Q",
-                color=alt.Color("Province:N", scale=alt.Scale(domain=list(PROVINCE_COLORS.keys()), range=list(PROVINCE_COLORS.values())), legend=None),
-                tooltip=["City:N", alt.Tooltip("Max:Q", format="$,.0f")]
-            )
-        )
-        
-        # Outliers with province-based colors, using existing Province column
-        outliers = alt.Chart(outliers_city[outliers_city["is_outlier"]]).mark_circle(size=60, stroke="black", strokeWidth=1).encode(
-            x=x_encoding, y="Price:Q",
-            color=alt.Color("Province:N", scale=alt.Scale(domain=list(PROVINCE_COLORS.keys()), range=list(PROVINCE_COLORS.values())), legend=None),
-            tooltip=["City:N", alt.Tooltip("Price:Q", format="$,.0f")]
-        )
-        
-        chart = (whiskers + box + median + outliers).properties(
-            width="container", height="container", title="City Price Distribution"
-        ).configure_title(fontSize=25, font="Roboto, sans-serif", color="#000000", anchor="middle"
-        ).configure_axis(labelFontSize=CHART_AXIS_TICKFONT_FONT_SIZE, titleFontSize=CHART_AXIS_TITLE_FONT_SIZE
-        ).configure_view(strokeWidth=0)
-        
-        chart_spec = chart.to_dict(format="vega")
-        chart_spec["autosize"] = {"type": "fit", "contains": "padding"}
-        return chart_spec
+        aggregates = get_filter_aggregates(data)
+        return CHART1_TEMPLATE.render(stats=aggregates["city_stats"], outliers=aggregates["city_outliers"])
 
     # Callback 4: Update Chart 2 (Price vs Number of Bedrooms)
     @app.callback(
@@ -257,87 +743,10 @@ def register_callbacks(app):
 
     def update_chart2(data):
         if not data:
-            # Create a dummy DataFrame with one row
-            dummy_df = pd.DataFrame({"placeholder": [0]})
-            chart = alt.Chart(dummy_df).mark_text(
-                size=20, 
-                align="center", 
-                baseline="middle",
-                fontWeight="bold"  # Make the text bold
-            ).encode(
-                text=alt.value("No Data Available for Selected Filters"),
-                # No explicit x or y encodings to center naturally
-            ).properties(
-                width="container",
-                height="container",
-                title="Price vs Number of Bedrooms"
-            ).configure_title(
-                fontSize=25, font="Roboto, sans-serif", color="#000000", anchor="middle"
-            ).configure_view(strokeWidth=0)
-            return chart.to_dict(format="vega")
-
-        
-        df = pd.DataFrame(data)
-        stats_bedrooms, outliers_bedrooms = compute_boxplot_stats(df, "Number_Beds")
-        x_encoding = alt.X("Number_Beds:N", scale=alt.Scale(paddingInner=0.5), title="Number of Bedrooms")
-
-        box_color = "#4682b4"
-        
-        # Box plot with fixed color
-        box = alt.Chart(stats_bedrooms).mark_bar().encode(
-            x=x_encoding, 
-            y=alt.Y("Q1:Q", title="Price"), 
-            y2="Q3:Q", 
-            color=alt.value(box_color),
-            tooltip=["No. of Beds:N", alt.Tooltip("Max:Q", format="$,.0f"), alt.Tooltip("Q3:Q", format="$,.0f"),
-                     alt.Tooltip("median:Q", format="$,.0f"), alt.Tooltip("Q1:Q", format="$,.0f"),
-                     alt.Tooltip("Min:Q", format="$,.0f")]
-        )
-        
-        # Median tick
-        median = alt.Chart(stats_bedrooms).mark_tick(color="white", size=20).encode(
-            x=x_encoding, 
-            y="median:Q",
-            tooltip=["No. of Beds:N", alt.Tooltip("Max:Q", format="$,.0f"), alt.Tooltip("Q3:Q", format="$,.0f"),
-                     alt.Tooltip("median:Q", format="$,.0f"), alt.Tooltip("Q1:Q", format="$,.0f"),
-                     alt.Tooltip("Min:Q", format="$,.0f")]
-        )
-        
-        # Whiskers with the same fixed color
-        whiskers = (
-            alt.Chart(stats_bedrooms).mark_rule().encode(
-                x=x_encoding, 
-                y="Min:Q", 
-                y2="Q1:Q", 
-                color=alt.value(box_color),
-                tooltip=["No. of Beds:N", alt.Tooltip("Min:Q", format="$,.0f")]
-            ) +
-            alt.Chart(stats_bedrooms).mark_rule().encode(
-                x=x_encoding, 
-                y="Q3:Q", 
-                y2="Max:Q", 
-                color=alt.value(box_color),
-                tooltip=["No. of Beds:N", alt.Tooltip("Max:Q", format="$,.0f")]
-            )
-        )
-        
-        # Outliers with the same fixed color
-        outliers = alt.Chart(outliers_bedrooms[outliers_bedrooms["is_outlier"]]).mark_point().encode(
-            x=x_encoding, 
-            y="Price:Q", 
-            color=alt.value(box_color),
-            tooltip=["Number_Beds:N", alt.Tooltip("Price:Q", format="$,.0f")]
-        )
+            return EMPTY_CHART2_SPEC.spec
 
-        chart = (whiskers + box + median + outliers).properties(
-            width="container", height="container", title="Price vs Number of Bedrooms"
-        ).configure_title(fontSize=25, font="Roboto, sans-serif", color="#000000", anchor="middle"
-        ).configure_axis(labelFontSize=CHART_AXIS_TICKFONT_FONT_SIZE, titleFontSize=CHART_AXIS_TITLE_FONT_SIZE
-        ).configure_view(strokeWidth=0)
-        
-        chart_spec = chart.to_dict(format="vega")
-        chart_spec["autosize"] = {"type": "fit", "contains": "padding"}
-        return chart_spec
+        aggregates = get_filter_aggregates(data)
+        return CHART2_TEMPLATE.render(stats=aggregates["bedroom_stats"], outliers=aggregates["bedroom_outliers"])
 
     # Callback 5: Update Chart 3 (Bubble Chart)
     @app.callback(
@@ -346,6 +755,9 @@ def register_callbacks(app):
     )
 
     def update_chart3(data):
+        import plotly.express as px
+        import plotly.graph_objects as go
+
         if not data:
             fig = go.Figure()
             fig.add_annotation(
@@ -372,14 +784,10 @@ def register_callbacks(app):
                 xaxis=dict(showgrid=False, zeroline=False),
                 yaxis=dict(showgrid=False, zeroline=False),
             )
-            return fig
-        
-        df = pd.DataFrame(data)
-        city_data = df.groupby("City").agg({
-            "Price": "median", "Median_Family_Income": "median", "Population": "first", "Province": "first"
-        }).reset_index()
-        city_data["Price_Income_Ratio"] = city_data["Price"] / city_data["Median_Family_Income"]
+            return slim_plotly_template(fig)
         
+        city_data = get_filter_aggregates(data)["city_ratios"]
+
         fig = px.scatter(
             city_data, x="City", y="Price_Income_Ratio", size="Population", color="Province",
             hover_name="City", custom_data=["Price", "Province"],
@@ -410,7 +818,7 @@ def register_callbacks(app):
             ),
             plot_bgcolor="#F5F5F5", paper_bgcolor="#FFFFFF", margin=dict(l=10, r=10, t=50, b=10),
         )
-        return fig
+        return slim_plotly_template(fig)
 
     # Callback 6: Update Map
     @app.callback(
@@ -419,45 +827,6 @@ def register_callbacks(app):
     )
     def update_map(data):
         if not data:
-            return alt.Chart(pd.DataFrame()).mark_text().encode(
-                text=alt.value("No Data Available")
-            ).properties(
-                title="Map of Canadian Provinces", width=600, height=400
-            ).to_dict()
-        
-        df = pd.DataFrame(data)
-        agg_df = df.groupby(["City", "Province"]).agg({
-            "Price": "median", "Number_Beds": "mean"
-        }).reset_index()
-        map_df = pd.merge(agg_df, df_locations, on=["City", "Province"], how="left")
-
-        if "Halifax" in map_df["City"].values:
-            map_df.loc[map_df["City"] == "Halifax", "Latitude"] = 44.6488
-            map_df.loc[map_df["City"] == "Halifax", "Longitude"] = -63.5752
-
-        base_map = alt.Chart(alt.Data(values=geojson_data['features'])).mark_geoshape(stroke='white').project(
-            'transverseMercator', rotate=[90, 0, 0]
-        ).encode(
-            tooltip=alt.Tooltip('properties.name:N', title="Province"),
-            color=alt.Color('properties.name:N', scale=alt.Scale(domain=list(PROVINCE_COLORS.keys()), range=list(PROVINCE_COLORS.values())), legend=None),
-        )
-
-        city_markers = alt.Chart(map_df).mark_point(
-            shape='triangle-down',
-            filled=True,
-            opacity=1,          # Low opacity for semi-transparency
-        ).encode(
-            longitude='Longitude:Q',
-            latitude='Latitude:Q',
-            color=alt.Color('Price:Q', scale=alt.Scale(scheme='sinebow')),  # More visible color scheme
-            size=alt.Size('Price:Q', scale=alt.Scale(range=[50, 500])),
-            tooltip=["City:N",
-                     alt.Tooltip('Price:Q', title="Median Price", format=",.0f"),
-                     alt.Tooltip('Number_Beds:Q', title="Average Bedrooms", format=".2f")]
-        )
-        
-        final_map = (base_map + city_markers).properties(
-            width="container", height="container", title="Map of Canadian Provinces with Selected Cities"
-        ).configure_title(fontSize=25, font='Roboto, sans-serif', color="#000000", anchor='middle')
+            return EMPTY_MAP_SPEC.spec
 
-        return final_map.to_dict(format="vega")
\ No newline at end of file
+        return map_template.render(markers=get_filter_aggregates(data)["map_markers"])
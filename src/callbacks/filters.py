@@ -1,8 +1,5 @@
 from dash import Output, Input, State
-from src.utils.data_loader import load_data
-
-# Load the datasets once when the module is imported
-df_locations, df_housing = load_data()
+from src.utils.data_context import get_data_context
 
 def register_callbacks(app):
     """
@@ -31,12 +28,7 @@ def register_callbacks(app):
         Returns:
             list: A list of city options as dictionaries with "label" and "value".
         """
-        if selected_provinces and len(selected_provinces) > 0:
-            filtered_df = df_housing[df_housing["Province"].isin(selected_provinces)]
-            city_options = [{"label": city, "value": city} for city in filtered_df["City"].unique()]
-        else:
-            city_options = [{"label": city, "value": city} for city in df_housing["City"].unique()]
-        return city_options
+        return get_data_context().catalog.city_options(selected_provinces)
 
     # Callback to reset the filters to default values
     @app.callback(
@@ -57,12 +49,8 @@ def register_callbacks(app):
         Returns:
             tuple: Default values for city, province, bedroom slider, and bathroom slider.
         """
-        return (
-            ["Vancouver", "Toronto", "Montreal", "Ottawa"],
-            [],  # Province filter is reset to empty (or default values if you prefer)
-            [df_housing["Number_Beds"].min(), df_housing["Number_Beds"].max()],
-            [df_housing["Number_Baths"].min(), df_housing["Number_Baths"].max()]
-        )
+        # Default cities, no province, and the full bedroom and bathroom ranges
+        return get_data_context().catalog.reset_values()
 
     # Callback to toggle About text visibility
     @app.callback(
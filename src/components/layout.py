@@ -5,12 +5,12 @@ from src.components.sidebar import create_sidebar
 from src.components.summary_cards import create_summary_cards
 from src.components.charts import create_map_card, create_chart1_card, create_chart2_card, create_chart3_card
 
-def create_layout(df):
+def create_layout(catalog):
     """
     Creates the main layout of the Dash application.
 
     Args:
-        df (pd.DataFrame): The dataset used for populating sidebar filters.
+        catalog (FilterCatalog): Filter options and bounds used by the sidebar.
 
     Returns:
         dbc.Container: A Bootstrap container containing the full dashboard layout.
@@ -23,7 +23,7 @@ def create_layout(df):
     """
     return dbc.Container(fluid=True, children=[
         dbc.Row([
-            create_sidebar(df),  # Sidebar, always visible
+            create_sidebar(catalog),  # Sidebar, always visible
             dbc.Col(
                 html.Div([
                             # html.Br(),
@@ -1,12 +1,16 @@
+import logging
+
 import dash_bootstrap_components as dbc
 from dash import html, dcc
 
-def create_sidebar(df):
+logger = logging.getLogger(__name__)
+
+def create_sidebar(catalog):
     """
     Creates the sidebar component for the Canadian House Prices Dashboard.
 
     Args:
-        df (pd.DataFrame): The dataset used for populating sidebar filter options.
+        catalog (FilterCatalog): Filter options and slider bounds of the dataset.
 
     Returns:
         dbc.Col: A Bootstrap-styled column containing filters, buttons, and additional information.
@@ -22,7 +26,9 @@ def create_sidebar(df):
         - GitHub & About Buttons
         - About Information (Toggled)
     """
-    print("create_sidebar called from components/sidebar.py")
+    logger.debug("Building the sidebar")
+    beds_min, beds_max = catalog.beds_range
+    baths_min, baths_max = catalog.baths_range
     return dbc.Col([
         html.H3("Canadian House Prices Dashboard", className="mb-4", style={"color": "#FFFFFF", "font-weight": "bold"}),
         
@@ -48,7 +54,7 @@ def create_sidebar(df):
             html.H5("Province", className="mb-4", style={"color": "#FFFFFF"}),
             dcc.Dropdown(
                 id="province-filter",
-                options=[{"label": province, "value": province} for province in df["Province"].unique()],
+                options=catalog.province_options(),
                 multi=True,
                 placeholder="Select Province"
                 )
@@ -59,10 +65,10 @@ def create_sidebar(df):
             html.H5("City", className="mb-4", style={"color": "#FFFFFF"}),
             dcc.Dropdown(
                 id="city-filter",
-                options=[{"label": city, "value": city} for city in df["City"].unique()],
+                options=catalog.city_options(),
                 multi=True,
                 placeholder="Select City",
-                value=["Vancouver", "Toronto", "Montreal", "Ottawa"]
+                value=list(catalog.default_cities)
                 )
             ], className="mb-4"),
         
@@ -71,12 +77,12 @@ def create_sidebar(df):
             html.H5("Bedrooms", className="mb-4", style={"color": "#FFFFFF"}),
             dcc.RangeSlider(
                 id="bedrooms-slider",
-                min=df["Number_Beds"].min(),
-                max=df["Number_Beds"].max(),
+                min=beds_min,
+                max=beds_max,
                 step=1,
-                marks={i: str(i) for i in range(df["Number_Beds"].min(), df["Number_Beds"].max() + 1)},
+                marks={i: str(i) for i in range(beds_min, beds_max + 1)},
                 tooltip={"always_visible": True, "placement": "bottom"},
-                value=[df["Number_Beds"].min(), df["Number_Beds"].max()]
+                value=[beds_min, beds_max]
                 )
             ], className="mb-4"),
         
@@ -85,12 +91,12 @@ def create_sidebar(df):
             html.H5("Bathrooms", className="mb-4", style={"color": "#FFFFFF"}),
             dcc.RangeSlider(
                 id="bathrooms-slider",
-                min=df["Number_Baths"].min(),
-                max=df["Number_Baths"].max(),
+                min=baths_min,
+                max=baths_max,
                 step=1,
-                marks={i: str(i) for i in range(df["Number_Baths"].min(), df["Number_Baths"].max() + 1)},
+                marks={i: str(i) for i in range(baths_min, baths_max + 1)},
                 tooltip={"always_visible": True, "placement": "bottom"},
-                value=[df["Number_Baths"].min(), df["Number_Baths"].max()]
+                value=[baths_min, baths_max]
                 )
             ], className="mb-4"),
         
@@ -0,0 +1,188 @@
+import numpy as np
+import pandas as pd
+
+class CellLayout:
+    """
+    Cell coordinates shared by the precomputed aggregate structures.
+
+    A cell is a (location, Number_Beds, Number_Baths) triple, where a location
+    is a (City, Province) pair, since a few cities appear under more than one
+    province in the dataset. Bedroom and bathroom axes cover every integer
+    between the observed minimum and maximum.
+
+    Args:
+        df (pd.DataFrame): The housing dataset defining the axes.
+    """
+
+    def __init__(self, df):
+        locations = df[["City", "Province"]].drop_duplicates()
+        self.cities = locations["City"].to_numpy()
+        self.provinces = locations["Province"].to_numpy()
+        self._location_index = pd.MultiIndex.from_arrays([self.cities, self.provinces])
+        self.bed_values = np.arange(df["Number_Beds"].min(), df["Number_Beds"].max() + 1)
+        self.bath_values = np.arange(df["Number_Baths"].min(), df["Number_Baths"].max() + 1)
+        self.shape = (len(self.cities), len(self.bed_values), len(self.bath_values))
+        self.size = int(np.prod(self.shape))
+
+    def cell_codes(self, df):
+        """
+        Return the flat cell index of every row.
+
+        Args:
+            df (pd.DataFrame): Rows whose locations and counts lie on this layout.
+
+        Returns:
+            np.ndarray: One int64 cell index per row.
+        """
+        loc = self._location_index.get_indexer(pd.MultiIndex.from_arrays([df["City"], df["Province"]]))
+        beds = df["Number_Beds"].to_numpy().astype(np.int64) - self.bed_values[0]
+        baths = df["Number_Baths"].to_numpy().astype(np.int64) - self.bath_values[0]
+        return np.ravel_multi_index((loc, beds, baths), self.shape)
+
+    def select_locations(self, selected_cities=(), selected_provinces=()):
+        """
+        Return the location indices matching the city and province filters.
+
+        Args:
+            selected_cities: Iterable of cities (empty means no city filter).
+            selected_provinces: Iterable of provinces (empty means no province filter).
+
+        Returns:
+            np.ndarray: Indices into the location axis.
+        """
+        mask = np.ones(len(self.cities), dtype=bool)
+        if selected_cities:
+            mask &= np.isin(self.cities, list(selected_cities))
+        if selected_provinces:
+            mask &= np.isin(self.provinces, list(selected_provinces))
+        return np.flatnonzero(mask)
+
+    @staticmethod
+    def axis_slice(values, value_range):
+        """Translate an inclusive (min, max) value range to axis positions [start, stop)."""
+        if value_range is None:
+            return 0, len(values)
+        start = min(max(int(value_range[0]) - int(values[0]), 0), len(values))
+        stop = min(int(value_range[1]) - int(values[0]) + 1, len(values))
+        return start, max(start, stop)
+
+    def select_cells(self, selected_cities=(), selected_provinces=(),
+                     bedrooms_range=None, bathrooms_range=None):
+        """
+        Return the flat indices of every cell inside a filter state.
+
+        Args:
+            selected_cities: Iterable of cities (empty means no city filter).
+            selected_provinces: Iterable of provinces (empty means no province filter).
+            bedrooms_range: (min, max) bedrooms, or None for no bound.
+            bathrooms_range: (min, max) bathrooms, or None for no bound.
+
+        Returns:
+            np.ndarray: Flat cell indices.
+        """
+        locations = self.select_locations(selected_cities, selected_provinces)
+        b0, b1 = self.axis_slice(self.bed_values, bedrooms_range)
+        t0, t1 = self.axis_slice(self.bath_values, bathrooms_range)
+        grid = np.ix_(locations, np.arange(b0, b1), np.arange(t0, t1))
+        return np.ravel_multi_index(grid, self.shape).ravel()
+
+    def cell_labels(self, cells, column):
+        """
+        Return the value of a grouping column for each cell.
+
+        Args:
+            cells (np.ndarray): Flat cell indices.
+            column (str): "City", "Province", "Number_Beds" or "Number_Baths".
+
+        Returns:
+            np.ndarray: One label per cell.
+        """
+        loc, bed, bath = np.unravel_index(cells, self.shape)
+        labels = {
+            "City": lambda: self.cities[loc],
+            "Province": lambda: self.provinces[loc],
+            "Number_Beds": lambda: self.bed_values[bed],
+            "Number_Baths": lambda: self.bath_values[bath],
+        }
+        return labels[column]()
+
+class AggregateCube:
+    """
+    Materialized aggregates over the cells of a CellLayout.
+
+    Each (location, Number_Beds, Number_Baths) cell stores the listing count,
+    the price sum, min and max. Counts and sums are also kept as 2-D prefix-sum
+    tables over the bedroom and bathroom axes, so any slider range resolves
+    with four lookups per location, regardless of how many listings there are.
+    Min and max are reduced over the selected cells, which is bounded by the
+    grid size rather than the listing count.
+
+    Args:
+        df (pd.DataFrame): The housing dataset to aggregate.
+    """
+
+    def __init__(self, df):
+        self.layout = CellLayout(df)
+        shape, size = self.layout.shape, self.layout.size
+        cell = self.layout.cell_codes(df)
+        price = df["Price"].to_numpy().astype(np.float64)
+
+        self.count = np.bincount(cell, minlength=size).reshape(shape)
+        self.price_sum = np.bincount(cell, weights=price, minlength=size).reshape(shape)
+        self.price_min = np.full(size, np.inf)
+        np.minimum.at(self.price_min, cell, price)
+        self.price_min = self.price_min.reshape(shape)
+        self.price_max = np.full(size, -np.inf)
+        np.maximum.at(self.price_max, cell, price)
+        self.price_max = self.price_max.reshape(shape)
+
+        self.prefix = {
+            "count": self._prefix_sum(self.count),
+            "beds_sum": self._prefix_sum(self.count * self.layout.bed_values[None, :, None]),
+            "baths_sum": self._prefix_sum(self.count * self.layout.bath_values[None, None, :]),
+            "price_sum": self._prefix_sum(self.price_sum),
+        }
+
+    @staticmethod
+    def _prefix_sum(grid):
+        """Zero-padded 2-D prefix sums over the last two axes of a cube."""
+        padded = np.zeros((grid.shape[0], grid.shape[1] + 1, grid.shape[2] + 1), dtype=grid.dtype)
+        padded[:, 1:, 1:] = grid.cumsum(axis=1).cumsum(axis=2)
+        return padded
+
+    def summarize(self, selected_cities=(), selected_provinces=(),
+                  bedrooms_range=None, bathrooms_range=None):
+        """
+        Compute the summary-card statistics for a filter state from the cube.
+
+        Args:
+            selected_cities: Iterable of cities (empty means no city filter).
+            selected_provinces: Iterable of provinces (empty means no province filter).
+            bedrooms_range: (min, max) bedrooms, or None for no bound.
+            bathrooms_range: (min, max) bathrooms, or None for no bound.
+
+        Returns:
+            dict: count, avg_bedrooms, avg_bathrooms, avg_price, min_price and
+            max_price. Averages and bounds are None when nothing matches.
+        """
+        layout = self.layout
+        locations = layout.select_locations(selected_cities, selected_provinces)
+        b0, b1 = layout.axis_slice(layout.bed_values, bedrooms_range)
+        t0, t1 = layout.axis_slice(layout.bath_values, bathrooms_range)
+
+        def range_sum(name):
+            table = self.prefix[name][locations]
+            return (table[:, b1, t1] - table[:, b0, t1] - table[:, b1, t0] + table[:, b0, t0]).sum()
+
+        count = int(range_sum("count"))
+        if count == 0:
+            return {"count": 0, "avg_bedrooms": None, "avg_bathrooms": None,
+                    "avg_price": None, "min_price": None, "max_price": None}
+        return {
+            "count": count,
+            "avg_bedrooms": range_sum("beds_sum") / count,
+            "avg_bathrooms": range_sum("baths_sum") / count,
+            "avg_price": range_sum("price_sum") / count,
+            "min_price": float(self.price_min[locations, b0:b1, t0:t1].min()),
+            "max_price": float(self.price_max[locations, b0:b1, t0:t1].max()),
+        }
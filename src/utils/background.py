@@ -0,0 +1,175 @@
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from dash import DiskcacheManager
+
+from src.utils.env import env_flag
+
+try:
+    import fcntl
+except ImportError:  # Windows: job slots are not enforced
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Opt-in: run the filter aggregation as a Dash background callback (needs `pip install "dash[diskcache]"`)
+BACKGROUND_CALLBACKS = env_flag("BACKGROUND_CALLBACKS")
+
+# Aggregation jobs allowed to compute at once on this host. Each job is still its own
+# process; the ones over the limit wait (idle) for a slot, so this caps CPU use, not processes
+BACKGROUND_JOBS = int(os.environ.get("BACKGROUND_JOBS", "2"))
+
+# How often the browser polls for a background job's result, in milliseconds (Dash defaults to 1000)
+BACKGROUND_POLL_MS = int(os.environ.get("BACKGROUND_POLL_MS", "250"))
+
+# Job results, computed aggregates and slot locks, shared by every gunicorn worker on the host
+BACKGROUND_CACHE_DIR = Path(os.environ.get("BACKGROUND_CACHE_DIR",
+                                           Path(tempfile.gettempdir()) / "dashboard-background"))
+
+class JobSlots:
+    """
+    A host-wide limit on concurrently running jobs, backed by lock files.
+
+    Each slot is an flock on its own file. The kernel releases a lock when
+    its process exits, so a job killed on cancellation never leaks its slot
+    (a semaphore would stay taken).
+
+    Args:
+        directory (Path): Directory holding the slot files.
+        size (int): Number of slots.
+        poll (float): Seconds between attempts while every slot is taken.
+    """
+
+    def __init__(self, directory, size, poll=0.05):
+        self.directory = Path(directory)
+        self.size = size
+        self.poll = poll
+
+    @contextmanager
+    def acquire(self):
+        """Hold a free slot for the duration of the with block, waiting for one if needed."""
+        if fcntl is None or self.size < 1:
+            yield
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        while True:
+            for i in range(self.size):
+                slot = open(self.directory / f"slot-{i}.lock", "a")
+                try:
+                    fcntl.flock(slot, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    slot.close()
+                    continue
+                try:
+                    yield
+                finally:
+                    fcntl.flock(slot, fcntl.LOCK_UN)
+                    slot.close()
+                return
+            time.sleep(self.poll)
+
+class BoundedDiskcacheManager(DiskcacheManager):
+    """
+    DiskcacheManager whose job processes compute at most `slots.size` at a time.
+
+    Dash still starts one process per background job; each waits for a
+    JobSlots slot before running the callback, so the slots bound the jobs
+    computing at once, not the processes. The request thread that started
+    the job returns at once either way. Waiting processes stay few because
+    Dash terminates a job as soon as the same callback fires again.
+
+    Args:
+        cache: diskcache.Cache holding job results and progress.
+        slots (JobSlots): Host-wide limit on running jobs.
+        **kwargs: Passed to DiskcacheManager (cache_by, expire).
+    """
+
+    def __init__(self, cache, slots, **kwargs):
+        super().__init__(cache, **kwargs)
+        self.slots = slots
+
+    def call_job_fn(self, key, job_fn, args, context):
+        slots = self.slots
+
+        def bounded_job_fn(*job_args):
+            with slots.acquire():
+                job_fn(*job_args)
+
+        return super().call_job_fn(key, bounded_job_fn, args, context)
+
+_manager = None
+_aggregate_store = None
+_manager_lock = threading.Lock()
+
+def get_background_manager(cache_dir=None, jobs=None):
+    """
+    Return the process-wide background callback manager, creating it on first use.
+
+    Args:
+        cache_dir (Path): Overrides BACKGROUND_CACHE_DIR.
+        jobs (int): Overrides BACKGROUND_JOBS.
+
+    Returns:
+        BoundedDiskcacheManager: The manager.
+    """
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            import diskcache
+
+            cache_dir = Path(cache_dir or BACKGROUND_CACHE_DIR)
+            jobs = BACKGROUND_JOBS if jobs is None else jobs
+            _manager = BoundedDiskcacheManager(diskcache.Cache(str(cache_dir / "results")),
+                                               JobSlots(cache_dir / "slots", jobs))
+            logger.info("Aggregating filter states in the background, %d jobs at a time (%s)", jobs, cache_dir)
+    return _manager
+
+def get_aggregate_store(cache_dir=None, enabled=None):
+    """
+    Return the on-disk store that hands computed aggregates to the workers.
+
+    A background job computes a filter state's aggregates in its own
+    process, so it leaves them here for the chart callbacks, which run in
+    whichever worker serves them.
+
+    Args:
+        cache_dir (Path): Overrides BACKGROUND_CACHE_DIR.
+        enabled (bool): Overrides BACKGROUND_CALLBACKS.
+
+    Returns:
+        diskcache.Cache: The store, or None when background callbacks are off.
+    """
+    global _aggregate_store
+    enabled = BACKGROUND_CALLBACKS if enabled is None else enabled
+    if not enabled:
+        return None
+    with _manager_lock:
+        if _aggregate_store is None:
+            import diskcache
+
+            _aggregate_store = diskcache.Cache(str(Path(cache_dir or BACKGROUND_CACHE_DIR) / "aggregates"))
+    return _aggregate_store
+
+def background_callback_options(enabled=None):
+    """
+    Keyword arguments that make an app.callback run in the background, if enabled.
+
+    A job still running when its callback fires again is terminated by
+    Dash (the renderer sends it as oldJob), so changing a filter cancels
+    the aggregation of the previous selection without any cancel inputs.
+
+    Args:
+        enabled (bool): Overrides BACKGROUND_CALLBACKS.
+
+    Returns:
+        dict: background, manager and interval arguments, or {} when disabled.
+    """
+    enabled = BACKGROUND_CALLBACKS if enabled is None else enabled
+    if not enabled:
+        return {}
+    return {"background": True, "manager": get_background_manager(), "interval": BACKGROUND_POLL_MS}
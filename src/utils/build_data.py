@@ -0,0 +1,224 @@
+"""
+Build the processed housing and location tables from the raw listings CSV.
+
+The dashboard reads data/processed/housing_data.feather and locations.feather.
+This script derives both from data/raw/CanadianHousePrices_Top45Cities.csv,
+reading the CSV in chunks so memory stays bounded by the chunk size:
+    - types are normalized and known data-entry errors corrected,
+    - listings outside the dashboard's price and room bounds are dropped,
+    - duplicate listings are dropped by a content hash of Address, City and Price,
+    - the per-city coordinates are split out into the location table.
+
+The processed housing table has no Address column, so the hash of every kept
+listing is stored next to it (housing_hashes.npy). --append uses it to add a
+new batch of listings without reprocessing the full dump: only the batch is
+read, and listings already present are skipped.
+
+Usage:
+    python -m src.utils.build_data [--source CSV] [--output-dir DIR] [--chunksize ROWS]
+    python -m src.utils.build_data --append BATCH_CSV [BATCH_CSV ...] [--output-dir DIR]
+"""
+import argparse
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.utils.data_loader import PROCESSED_DIR, HOUSING_FILE, LOCATIONS_FILE
+
+DEFAULT_SOURCE = PROCESSED_DIR.parent / "raw" / "CanadianHousePrices_Top45Cities.csv"
+DEFAULT_OUTPUT_DIR = PROCESSED_DIR
+HASHES_FILE = "housing_hashes.npy"
+
+CSV_ENCODING = "latin-1"
+CSV_DTYPES = {
+    "City": "string", "Province": "string", "Address": "string",
+    "Price": "float64", "Number_Beds": "int64", "Number_Baths": "int64",
+    "Population": "int64", "Median_Family_Income": "float64",
+    "Latitude": "float64", "Longitude": "float64",
+}
+HOUSING_COLUMNS = ["Province", "City", "Price", "Number_Beds", "Number_Baths",
+                   "Population", "Median_Family_Income"]
+LOCATION_COLUMNS = ["Province", "City", "Latitude", "Longitude"]
+DEDUPE_COLUMNS = ["Address", "City", "Price"]
+
+# Listings outside these bounds are treated as data-entry errors
+MAX_PRICE = 10_000_000
+MAX_ROOMS = 10
+
+# Known errors in the raw dump
+PROVINCE_CORRECTIONS = {"Nanaimo": "British Columbia"}
+COORDINATE_CORRECTIONS = {"Halifax": (44.6488, -63.5752)}
+
+def normalize_chunk(chunk):
+    """
+    Normalize the types and values of a chunk of raw listings.
+
+    Args:
+        chunk (pd.DataFrame): Rows read from the raw CSV.
+
+    Returns:
+        pd.DataFrame: Rows within the price and room bounds, with stripped
+        strings and corrected provinces and coordinates.
+    """
+    chunk = chunk.astype(CSV_DTYPES)
+    for column in ("City", "Province", "Address"):
+        chunk[column] = chunk[column].str.strip()
+
+    corrected = chunk["City"].map(PROVINCE_CORRECTIONS)
+    chunk["Province"] = corrected.fillna(chunk["Province"])
+    for city, (latitude, longitude) in COORDINATE_CORRECTIONS.items():
+        chunk.loc[chunk["City"] == city, ["Latitude", "Longitude"]] = [latitude, longitude]
+
+    in_bounds = ((chunk["Price"] <= MAX_PRICE)
+                 & (chunk["Number_Beds"] <= MAX_ROOMS)
+                 & (chunk["Number_Baths"] <= MAX_ROOMS))
+    return chunk[in_bounds]
+
+def listing_hashes(df):
+    """
+    Hash the identifying content of each listing.
+
+    Args:
+        df (pd.DataFrame): Listings with the DEDUPE_COLUMNS.
+
+    Returns:
+        np.ndarray: One uint64 hash per row.
+    """
+    return pd.util.hash_pandas_object(df[DEDUPE_COLUMNS], index=False).to_numpy()
+
+def process_listings(sources, seen_hashes=None, chunksize=10_000):
+    """
+    Stream raw CSV files into housing and location rows, skipping duplicates.
+
+    Args:
+        sources (list): Paths of raw CSV files, read in order.
+        seen_hashes (np.ndarray): Hashes of listings already processed.
+        chunksize (int): Rows read from the CSV at a time.
+
+    Returns:
+        Tuple of (housing DataFrame, locations DataFrame, hashes of the new listings).
+    """
+    seen = set() if seen_hashes is None else set(seen_hashes.tolist())
+    housing_parts, location_parts, hash_parts = [], [], []
+
+    for source in sources:
+        for chunk in pd.read_csv(source, encoding=CSV_ENCODING, chunksize=chunksize):
+            chunk = normalize_chunk(chunk)
+            hashes = listing_hashes(chunk)
+            keep = np.zeros(len(chunk), dtype=bool)
+            for i, h in enumerate(hashes.tolist()):
+                if h not in seen:
+                    seen.add(h)
+                    keep[i] = True
+            housing_parts.append(chunk.loc[keep, HOUSING_COLUMNS])
+            location_parts.append(chunk[LOCATION_COLUMNS].drop_duplicates(["Province", "City"]))
+            hash_parts.append(hashes[keep])
+
+    housing = pd.concat(housing_parts, ignore_index=True) if housing_parts else pd.DataFrame(columns=HOUSING_COLUMNS)
+    locations = pd.concat(location_parts, ignore_index=True) if location_parts else pd.DataFrame(columns=LOCATION_COLUMNS)
+    hashes = np.concatenate(hash_parts) if hash_parts else np.empty(0, dtype=np.uint64)
+    return to_output_types(housing), to_output_types(locations), hashes
+
+def to_output_types(df):
+    """Convert the nullable string columns back to the object dtype the dashboard expects."""
+    return df.astype({c: object for c in ("Province", "City") if c in df.columns})
+
+def merge_locations(*tables):
+    """Combine location tables, keeping the first coordinates seen per (Province, City), sorted."""
+    locations = pd.concat(tables, ignore_index=True)
+    locations = locations.drop_duplicates(["Province", "City"], keep="first")
+    return locations.sort_values(["Province", "City"]).reset_index(drop=True)
+
+def write_atomic(path, write):
+    """Write a file through a temporary sibling so readers never see a partial file."""
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.tmp")
+    write(tmp)
+    os.replace(tmp, path)
+
+def save_hashes(path, hashes):
+    """Save listing hashes as .npy (np.save would append a suffix to a bare path)."""
+    with open(path, "wb") as f:
+        np.save(f, hashes)
+
+def write_outputs(output_dir, housing, locations, hashes):
+    """
+    Write the housing table, location table and listing hashes.
+
+    The hashes are written last: a listing only counts as stored once its
+    hash is, so a write that fails part-way never makes a later append skip
+    listings that are not on disk.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    write_atomic(output_dir / LOCATIONS_FILE, locations.to_feather)
+    write_atomic(output_dir / HOUSING_FILE, housing.to_feather)
+    write_atomic(output_dir / HASHES_FILE, lambda p: save_hashes(p, hashes))
+
+def build_data(source=DEFAULT_SOURCE, output_dir=DEFAULT_OUTPUT_DIR, chunksize=10_000):
+    """
+    Rebuild the processed tables from the full raw CSV.
+
+    Args:
+        source (Path): Raw listings CSV.
+        output_dir (Path): Directory of the processed files.
+        chunksize (int): Rows read from the CSV at a time.
+
+    Returns:
+        Tuple of (housing DataFrame, locations DataFrame).
+    """
+    housing, locations, hashes = process_listings([source], chunksize=chunksize)
+    locations = merge_locations(locations)
+    write_outputs(output_dir, housing, locations, hashes)
+    return housing, locations
+
+def append_data(batches, output_dir=DEFAULT_OUTPUT_DIR, chunksize=10_000):
+    """
+    Append new raw listing batches to the processed tables.
+
+    Only the batches are read; listings whose hash is already stored are
+    skipped, so re-running a batch is a no-op.
+
+    Args:
+        batches (list): Raw CSV files with the same columns as the full dump.
+        output_dir (Path): Directory of the processed files to extend.
+        chunksize (int): Rows read from the CSV at a time.
+
+    Returns:
+        Tuple of (housing DataFrame, locations DataFrame, number of listings added).
+    """
+    output_dir = Path(output_dir)
+    hashes_path = output_dir / HASHES_FILE
+    if not hashes_path.exists():
+        raise FileNotFoundError(f"{hashes_path} not found; run a full build first")
+    existing_hashes = np.load(hashes_path)
+    # Hashes line up with the housing rows; rows past them were written by an
+    # append that failed before saving its hashes, and are added again below
+    existing_housing = pd.read_feather(output_dir / HOUSING_FILE).iloc[:len(existing_hashes)]
+    existing_locations = pd.read_feather(output_dir / LOCATIONS_FILE)
+
+    new_housing, new_locations, new_hashes = process_listings(batches, existing_hashes, chunksize)
+    housing = pd.concat([existing_housing, new_housing], ignore_index=True)
+    locations = merge_locations(existing_locations, new_locations)
+    write_outputs(output_dir, housing, locations, np.concatenate([existing_hashes, new_hashes]))
+    return housing, locations, len(new_housing)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the processed housing and location tables.")
+    parser.add_argument("--source", default=str(DEFAULT_SOURCE), help="Raw listings CSV for a full build.")
+    parser.add_argument("--append", nargs="+", metavar="CSV", help="Append these listing batches instead of rebuilding.")
+    parser.add_argument("--output-dir", default=str(DEFAULT_OUTPUT_DIR), help="Directory of the processed files.")
+    parser.add_argument("--chunksize", type=int, default=10_000, help="Rows read from the CSV at a time.")
+    args = parser.parse_args()
+
+    if args.append:
+        housing, locations, added = append_data(args.append, args.output_dir, args.chunksize)
+        print(f"Appended {added} listings; {len(housing)} listings, {len(locations)} locations in {args.output_dir}")
+    else:
+        housing, locations = build_data(args.source, args.output_dir, args.chunksize)
+        print(f"Wrote {len(housing)} listings and {len(locations)} locations to {args.output_dir}")
+
+if __name__ == "__main__":
+    main()
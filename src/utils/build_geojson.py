@@ -0,0 +1,155 @@
+"""
+Build the bundled, geometry-simplified Canada province boundaries.
+
+The dashboard map reads src/assets/canada_provinces.geojson from disk instead
+of fetching boundaries at import. This script regenerates that asset from a
+full-resolution GeoJSON source (a local path or URL): every ring is
+simplified with Douglas-Peucker at the given tolerance, islands smaller than
+the minimum area are dropped, coordinates are rounded, and rings are rewound
+to the orientation Vega/d3 expects.
+
+Usage:
+    python -m src.utils.build_geojson [--source PATH_OR_URL] [--tolerance DEG] [--min-area SQ_DEG]
+"""
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_SOURCE = "https://raw.githubusercontent.com/codeforamerica/click_that_hood/master/public/data/canada.geojson"
+DEFAULT_OUTPUT = Path(__file__).resolve().parents[1] / "assets" / "canada_provinces.geojson"
+
+def simplify_ring(ring, tolerance):
+    """
+    Simplify a closed ring with the Douglas-Peucker algorithm.
+
+    Args:
+        ring (np.ndarray): (n, 2) array of coordinates, first point equal to the last.
+        tolerance (float): Maximum distance, in degrees, a removed point may lie from the result.
+
+    Returns:
+        np.ndarray: The simplified ring, or None if it collapses below 4 points.
+    """
+    keep = np.zeros(len(ring), dtype=bool)
+    keep[0] = keep[-1] = True
+    # Split the closed ring at its farthest point so both halves have distinct endpoints
+    split = int(np.argmax(((ring - ring[0]) ** 2).sum(axis=1)))
+    keep[split] = True
+    stack = [(0, split), (split, len(ring) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        a, b = ring[start], ring[end]
+        points = ring[start + 1:end]
+        segment = b - a
+        length = np.hypot(*segment)
+        if length == 0:
+            distances = np.hypot(*(points - a).T)
+        else:
+            distances = np.abs(segment[0] * (points[:, 1] - a[1]) - segment[1] * (points[:, 0] - a[0])) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            index = start + 1 + farthest
+            keep[index] = True
+            stack.extend([(start, index), (index, end)])
+    simplified = ring[keep]
+    return simplified if len(simplified) >= 4 else None
+
+def signed_area(ring):
+    """Shoelace area of a ring; positive when counter-clockwise in lon/lat."""
+    x, y = ring[:, 0], ring[:, 1]
+    return 0.5 * float(np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1]))
+
+def simplify_polygon(rings, tolerance, precision, min_area=0.0):
+    """
+    Simplify one polygon (exterior ring followed by holes).
+
+    Exterior rings are wound clockwise and holes counter-clockwise, as d3-geo
+    (used by Vega's geoshape) requires.
+
+    Returns:
+        list: The simplified polygon rings, or None if the exterior collapses
+        or encloses less than min_area square degrees.
+    """
+    result = []
+    for i, ring in enumerate(rings):
+        simplified = simplify_ring(np.asarray(ring, dtype=np.float64), tolerance)
+        if simplified is not None and abs(signed_area(simplified)) < min_area:
+            simplified = None
+        if simplified is None:
+            if i == 0:
+                return None
+            continue
+        clockwise = signed_area(simplified) < 0
+        if clockwise != (i == 0):
+            simplified = simplified[::-1]
+        result.append(np.round(simplified, precision).tolist())
+    return result
+
+def simplify_feature(feature, tolerance, precision, min_area=0.0):
+    """Return a copy of a (Multi)Polygon feature with simplified geometry and only its name."""
+    geometry = feature["geometry"]
+    polygons = [geometry["coordinates"]] if geometry["type"] == "Polygon" else geometry["coordinates"]
+    simplified = [p for p in (simplify_polygon(rings, tolerance, precision, min_area) for rings in polygons) if p]
+    if not simplified:
+        # Keep the largest polygon at full detail rather than dropping the province
+        largest = max(polygons, key=lambda rings: abs(signed_area(np.asarray(rings[0]))))
+        simplified = [simplify_polygon(largest, 0, precision)]
+    return {
+        "type": "Feature",
+        "properties": {"name": feature["properties"]["name"]},
+        "geometry": {"type": "MultiPolygon", "coordinates": simplified},
+    }
+
+def read_source(source):
+    """Read GeoJSON from a local path or an http(s) URL."""
+    if source.startswith(("http://", "https://")):
+        from urllib.request import urlopen
+        with urlopen(source, timeout=30) as response:  # Raises HTTPError on an error status
+            return json.load(response)
+    with open(source, encoding="utf-8") as f:
+        return json.load(f)
+
+def build_geojson(source=DEFAULT_SOURCE, output=DEFAULT_OUTPUT, tolerance=0.05, precision=2, min_area=0.05):
+    """
+    Simplify a province GeoJSON source and write the bundled asset.
+
+    Args:
+        source (str): Path or URL of the full-resolution GeoJSON.
+        output (Path): Destination of the simplified GeoJSON.
+        tolerance (float): Douglas-Peucker tolerance in degrees.
+        precision (int): Decimal places kept in coordinates.
+        min_area (float): Polygons and holes smaller than this, in square degrees, are dropped.
+
+    Returns:
+        dict: The simplified FeatureCollection.
+    """
+    data = read_source(source)
+    simplified = {
+        "type": "FeatureCollection",
+        "features": [simplify_feature(f, tolerance, precision, min_area) for f in data["features"]],
+    }
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(simplified, separators=(",", ":")), encoding="utf-8")
+    return simplified
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the simplified Canada province GeoJSON asset.")
+    parser.add_argument("--source", default=DEFAULT_SOURCE, help="Full-resolution GeoJSON path or URL.")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT), help="Where to write the simplified GeoJSON.")
+    parser.add_argument("--tolerance", type=float, default=0.05, help="Simplification tolerance in degrees.")
+    parser.add_argument("--precision", type=int, default=2, help="Decimal places kept in coordinates.")
+    parser.add_argument("--min-area", type=float, default=0.05, help="Drop islands smaller than this (square degrees).")
+    args = parser.parse_args()
+
+    simplified = build_geojson(args.source, args.output, args.tolerance, args.precision, args.min_area)
+    n_points = sum(len(ring) for f in simplified["features"]
+                   for polygon in f["geometry"]["coordinates"] for ring in polygon)
+    size = Path(args.output).stat().st_size
+    print(f"Wrote {len(simplified['features'])} features, {n_points} points, {size:,} bytes to {args.output}")
+
+if __name__ == "__main__":
+    main()
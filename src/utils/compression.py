@@ -0,0 +1,89 @@
+import gzip
+import os
+
+from flask import request
+
+from src.utils.env import env_flag
+
+# Gzip the Dash JSON routes for clients that accept it (set to 0 to leave them uncompressed)
+RESPONSE_COMPRESSION = env_flag("RESPONSE_COMPRESSION", default=True)
+COMPRESSION_LEVEL = int(os.environ.get("COMPRESSION_LEVEL", "6"))
+
+# Smaller bodies gain little and cost a compression call
+COMPRESSION_MIN_BYTES = int(os.environ.get("COMPRESSION_MIN_BYTES", "1024"))
+
+# Dash routes returning JSON generated per request; static assets are left to the front-end server
+COMPRESSED_ROUTES = ("_dash-update-component", "_dash-layout", "_dash-dependencies")
+
+def accepts_gzip(accept_encoding):
+    """
+    Whether an Accept-Encoding header allows gzip.
+
+    Args:
+        accept_encoding (str): The header value.
+
+    Returns:
+        bool: Whether gzip is listed with a nonzero quality or, if it is not
+        listed, whether "*" is. An explicit gzip entry wins over "*", and
+        entries whose q value does not parse are ignored.
+    """
+    wildcard = False
+    for part in accept_encoding.lower().split(","):
+        coding, *params = [token.strip() for token in part.split(";")]
+        if coding not in ("gzip", "*"):
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = None
+        if quality is None:
+            continue
+        if coding == "gzip":
+            return quality > 0
+        wildcard = quality > 0
+    return wildcard
+
+def compress_response(response, level=COMPRESSION_LEVEL, min_bytes=COMPRESSION_MIN_BYTES):
+    """
+    Gzip a Flask response to a Dash JSON route if the client accepts it.
+
+    Args:
+        response (flask.Response): The response about to be sent.
+        level (int): Gzip compression level.
+        min_bytes (int): Responses smaller than this are sent as they are.
+
+    Returns:
+        flask.Response: The (possibly compressed) response.
+    """
+    if (response.status_code != 200 or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or not request.path.rstrip("/").endswith(COMPRESSED_ROUTES)):
+        return response
+    response.vary.add("Accept-Encoding")
+    if not accepts_gzip(request.headers.get("Accept-Encoding", "")):
+        return response
+    body = response.get_data()
+    if len(body) < min_bytes:
+        return response
+    response.set_data(gzip.compress(body, compresslevel=level))
+    response.headers["Content-Encoding"] = "gzip"
+    return response
+
+def register_compression(app):
+    """
+    Compress the app's Dash JSON responses, unless RESPONSE_COMPRESSION is off.
+
+    Args:
+        app (Dash): The Dash application.
+
+    Returns:
+        bool: Whether compression was enabled.
+    """
+    if not RESPONSE_COMPRESSION:
+        return False
+    app.server.after_request(compress_response)
+    return True
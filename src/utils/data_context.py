@@ -0,0 +1,233 @@
+import logging
+import os
+import signal
+import threading
+import time
+
+from src.utils.env import env_flag
+from src.utils.data_loader import load_data, get_data_dir, HOUSING_FILE, LOCATIONS_FILE
+from src.utils.filter_index import FilterIndex
+from src.utils.filter_catalog import FilterCatalog
+from src.utils.aggregates import AggregateCube
+from src.utils.sketches import QuantileSketchSet
+from src.utils.result_cache import ResultCache
+
+logger = logging.getLogger(__name__)
+
+# Filter results are cached as row-position arrays under a byte budget (per worker)
+FILTER_CACHE_MAX_BYTES = int(os.environ.get("FILTER_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+
+# Per-filter aggregates shared by every dashboard output, also cached per worker
+AGGREGATE_CACHE_MAX_BYTES = int(os.environ.get("AGGREGATE_CACHE_MAX_BYTES", 16 * 1024 * 1024))
+
+# Optional approximate mode: boxplot and median statistics from merged per-cell quantile sketches
+APPROX_QUANTILES = env_flag("APPROX_QUANTILES")
+QUANTILE_SKETCH_EPSILON = float(os.environ.get("QUANTILE_SKETCH_EPSILON", "0.01"))
+
+# Seconds between checks of the processed files for changes (0 disables polling)
+DATA_RELOAD_INTERVAL = float(os.environ.get("DATA_RELOAD_INTERVAL", "0"))
+
+def data_version(data_dir):
+    """
+    Identify the current contents of the processed files.
+
+    Args:
+        data_dir (Path): Processed-data directory.
+
+    Returns:
+        tuple: (mtime_ns, size) of each table, or None for a missing file.
+    """
+    version = []
+    for name in (LOCATIONS_FILE, HOUSING_FILE):
+        try:
+            stat = (data_dir / name).stat()
+            version.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            version.append(None)
+    return tuple(version)
+
+class DataContext:
+    """
+    The dashboard dataset and every read-only structure derived from it.
+
+    A context is built once per process tree: under gunicorn --preload (see
+    gunicorn.conf.py) the master builds it before forking, so workers start
+    with it in memory and share its pages copy-on-write. Those pages stay
+    shared because the large columns are numeric NumPy buffers (strings are
+    categorical codes into small dictionaries), whose elements are never
+    reference-counted, and because the master freezes the garbage collector
+    before forking. Only the result caches fill up per worker.
+
+    A context is never modified after it is built: reloading builds a new
+    one and swaps it in (see reload_data_context), so a request keeps using
+    the context it started with, and every derived cache goes with it.
+
+    Each worker reloads on its own, so after the first reload every worker
+    holds a private copy of the data and the copy-on-write sharing is gone.
+    To keep sharing across reloads, enable MMAP_DATA: the tables are then
+    mapped from the same files by every worker (only the derived index and
+    aggregates are rebuilt per worker).
+
+    Args:
+        locations (pd.DataFrame): Per-city coordinates.
+        housing (pd.DataFrame): Listings in the compact schema.
+        data_dir (Path): Directory the tables were read from, if any.
+        version: data_version of the files the tables were read from, if any.
+    """
+
+    def __init__(self, locations, housing, data_dir=None, version=None):
+        self.data_dir = data_dir
+        self.version = version
+        self.locations = locations
+        self.housing = housing
+        self.catalog = FilterCatalog(housing)
+        self.index = FilterIndex(housing)
+        self.cube = AggregateCube(housing)
+        self.sketches = (QuantileSketchSet(housing, QUANTILE_SKETCH_EPSILON, layout=self.cube.layout)
+                         if APPROX_QUANTILES else None)
+        self.filter_cache = ResultCache(max_bytes=FILTER_CACHE_MAX_BYTES)
+        self.aggregate_cache = ResultCache(max_bytes=AGGREGATE_CACHE_MAX_BYTES)
+
+    @classmethod
+    def load(cls, data_dir=None):
+        """
+        Read the processed tables and build a context from them.
+
+        Args:
+            data_dir: Processed-data directory; defaults to DATA_DIR or data/processed.
+
+        Returns:
+            DataContext: The loaded context.
+        """
+        data_dir = get_data_dir(data_dir)
+        version = data_version(data_dir)  # Taken first, so a concurrent rewrite triggers another reload
+        locations, housing = load_data(data_dir)
+        context = cls(locations, housing, data_dir, version)
+        logger.info("Data context ready: %d listings, %d locations from %s",
+                    len(housing), len(locations), data_dir)
+        return context
+
+_context = None
+_context_lock = threading.Lock()
+_reload_lock = threading.Lock()
+_reload_listeners = []
+
+def get_data_context():
+    """
+    Return the process-wide data context, loading it on first use.
+
+    Returns:
+        DataContext: The current context.
+    """
+    global _context
+    if _context is None:
+        with _context_lock:
+            if _context is None:
+                _context = DataContext.load()
+    return _context
+
+def set_data_context(context):
+    """
+    Replace the process-wide data context.
+
+    Requests already holding the previous context finish with it.
+
+    Args:
+        context (DataContext): The new context.
+    """
+    global _context
+    with _context_lock:
+        _context = context
+    for listener in list(_reload_listeners):
+        try:
+            listener(context)
+        except Exception:
+            logger.exception("Data context listener %r failed", listener)
+
+def add_reload_listener(listener):
+    """
+    Call listener(context) whenever a new data context is swapped in.
+
+    Args:
+        listener (callable): Function taking the new DataContext.
+    """
+    _reload_listeners.append(listener)
+
+def reload_data_context(force=False):
+    """
+    Rebuild the data context if the processed files changed, then swap it in.
+
+    The new dataset, index, cube and sketches are built while the current
+    context keeps serving; the swap itself is a single reference assignment.
+    A failed load is logged and leaves the current context in place.
+
+    Args:
+        force (bool): Reload even if the files look unchanged.
+
+    Returns:
+        bool: Whether a new context was swapped in.
+    """
+    with _reload_lock:  # One reload at a time
+        current = get_data_context()
+        data_dir = current.data_dir or get_data_dir()
+        if not force and data_version(data_dir) == current.version:
+            return False
+        try:
+            context = DataContext.load(data_dir)
+        except Exception:
+            logger.exception("Reloading data from %s failed; keeping the current data", data_dir)
+            return False
+        set_data_context(context)
+        logger.info("Swapped in reloaded data from %s", context.data_dir)
+        return True
+
+def request_reload(*_):
+    """Reload the data in a background thread; safe to use as a signal handler."""
+    threading.Thread(target=reload_data_context, kwargs={"force": True},
+                     name="data-reload", daemon=True).start()
+
+def start_reload_watcher(interval=DATA_RELOAD_INTERVAL, signum=getattr(signal, "SIGUSR2", None)):
+    """
+    Reload the data whenever the processed files change or a signal arrives.
+
+    Threads do not survive fork, so call this in each serving process (e.g.
+    gunicorn's post_fork), not in a preloading master.
+
+    Args:
+        interval (float): Seconds between file checks; 0 disables polling.
+        signum: Signal that forces a reload, or None. Only installed when
+            called from the main thread.
+
+    Returns:
+        threading.Thread: The polling thread, or None when polling is disabled.
+    """
+    if signum is not None and threading.current_thread() is threading.main_thread():
+        signal.signal(signum, request_reload)
+    if not interval:
+        return None
+
+    def watch():
+        while True:
+            time.sleep(interval)
+            try:
+                reload_data_context()
+            except Exception:
+                logger.exception("Data reload check failed")
+
+    watcher = threading.Thread(target=watch, name="data-reload-watcher", daemon=True)
+    watcher.start()
+    return watcher
+
+def init_data_context(data_dir=None):
+    """
+    Load the data context explicitly, e.g. in the gunicorn master before forking.
+
+    Args:
+        data_dir: Processed-data directory; defaults to DATA_DIR or data/processed.
+
+    Returns:
+        DataContext: The new process-wide context.
+    """
+    context = DataContext.load(data_dir)
+    set_data_context(context)
+    return context
@@ -1,29 +1,161 @@
+import logging
+import os
+from pathlib import Path
+import numpy as np
 import pandas as pd
 
-# Define global variables for the two datasets
-_data_locations = None
-_data_housing = None
+from src.utils.env import env_flag
 
-def load_data():
+logger = logging.getLogger(__name__)
+
+# Processed tables (see src/utils/build_data.py); DATA_DIR overrides the directory
+PROCESSED_DIR = Path(__file__).resolve().parents[2] / "data" / "processed"
+HOUSING_FILE = "housing_data.feather"
+LOCATIONS_FILE = "locations.feather"
+
+# Simplified province boundaries bundled with the app (see src/utils/build_geojson.py)
+GEOJSON_PATH = Path(__file__).resolve().parents[1] / "assets" / "canada_provinces.geojson"
+
+# Compact in-memory schema; every worker holds its own copy of both tables
+COMPACT_DTYPES = {
+    "City": "category",
+    "Province": "category",
+    "Number_Beds": np.int8,
+    "Number_Baths": np.int8,
+    "Price": np.int32,
+    "Population": np.int32,
+    "Median_Family_Income": np.int32,
+    "Latitude": np.float32,
+    "Longitude": np.float32,
+}
+
+# Optional zero-copy mode: memory-map uncompressed Arrow IPC copies of the tables, so
+# every worker on a host shares one page-cache copy instead of a private heap copy
+MMAP_DATA = env_flag("MMAP_DATA")
+
+
+def memory_usage(df):
+    """Return the deep memory usage of a DataFrame in bytes."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def compact_dtypes(df, name="data"):
     """
-    Load and merge the location and housing datasets into a single DataFrame.
-    
+    Convert a DataFrame to the compact in-memory schema and report the savings.
+
+    Strings become categoricals, counts int8, prices and incomes int32 (whole
+    dollars) and coordinates float32.
+
+    Args:
+        df (pd.DataFrame): Table as read from disk.
+        name (str): Table name used in the memory report.
+
     Returns:
-        pd.DataFrame: Merged DataFrame containing all data.
+        pd.DataFrame: The table with COMPACT_DTYPES applied to its columns.
+    """
+    before = memory_usage(df)
+    df = df.copy()
+    for column, dtype in COMPACT_DTYPES.items():
+        if column not in df.columns:
+            continue
+        if pd.api.types.is_integer_dtype(dtype) and pd.api.types.is_float_dtype(df[column]):
+            df[column] = df[column].round()  # e.g. the few listing prices with cents
+        df[column] = df[column].astype(dtype)
+    after = memory_usage(df)
+    logger.info("%s: %.2f MB -> %.2f MB in memory", name, before / 1e6, after / 1e6)
+    return df
+
+
+def write_arrow(df, path):
+    """
+    Write a DataFrame as an uncompressed Arrow IPC file that can be memory-mapped.
+
+    Args:
+        df (pd.DataFrame): Table already in the compact schema.
+        path (Path): Destination file, replaced atomically.
+    """
+    import pyarrow as pa
+
+    path = Path(path)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with pa.OSFile(str(tmp), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def read_arrow_mmap(path):
     """
-    print("load_data called from data_loader.py")
-    global _data_locations, _data_housing, _data
+    Memory-map an Arrow IPC file and wrap its columns without copying.
+
+    Numeric columns and categorical codes are read-only views of the mapped
+    pages; only the small category dictionaries are materialized.
 
-    # Load locations dataset if not already loaded
-    if _data_locations is None:
-        file_path_locations = r"data/processed/locations.feather"
-        print("reading locations data from data_loader.py")
-        _data_locations = pd.read_feather(file_path_locations)
+    Args:
+        path (Path): Uncompressed Arrow IPC file.
+
+    Returns:
+        pd.DataFrame: Table backed by the memory map.
+    """
+    import pyarrow as pa
 
-    # Load housing dataset if not already loaded
-    if _data_housing is None:
-        file_path_housing = r"data/processed/housing_data.feather"
-        print("reading housing data from data_loader.py")
-        _data_housing = pd.read_feather(file_path_housing)
+    table = pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+    return table.to_pandas(split_blocks=True)
 
-    return _data_locations, _data_housing
\ No newline at end of file
+
+def read_table(feather_path, name):
+    """
+    Read one processed table in the compact schema, memory-mapped when MMAP_DATA is set.
+
+    In mmap mode the Arrow copy next to the feather file is (re)generated
+    whenever it is missing or older than the feather file.
+
+    Args:
+        feather_path (Path): Path of the processed feather file.
+        name (str): Table name used in the memory report.
+
+    Returns:
+        pd.DataFrame: The table.
+    """
+    if not MMAP_DATA:
+        return compact_dtypes(pd.read_feather(feather_path), name)
+
+    arrow_path = feather_path.with_suffix(".arrow")
+    if not arrow_path.exists() or arrow_path.stat().st_mtime < feather_path.stat().st_mtime:
+        write_arrow(compact_dtypes(pd.read_feather(feather_path), name), arrow_path)
+    logger.info("%s: memory-mapped from %s", name, arrow_path)
+    return read_arrow_mmap(arrow_path)
+
+
+def get_data_dir(data_dir=None):
+    """
+    Resolve the processed-data directory.
+
+    Args:
+        data_dir: Explicit directory; falls back to the DATA_DIR environment
+            variable, then to the repository's data/processed.
+
+    Returns:
+        Path: Absolute directory of the processed tables.
+    """
+    return Path(data_dir or os.environ.get("DATA_DIR") or PROCESSED_DIR).resolve()
+
+
+def load_data(data_dir=None):
+    """
+    Load the location and housing datasets in the compact schema.
+
+    Each call reads the tables again; use src.utils.data_context for the
+    process-wide copy the dashboard serves.
+
+    Args:
+        data_dir: Processed-data directory (see get_data_dir).
+
+    Returns:
+        Tuple of (locations DataFrame, housing DataFrame).
+    """
+    data_dir = get_data_dir(data_dir)
+    locations = read_table(data_dir / LOCATIONS_FILE, "locations data")
+    housing = read_table(data_dir / HOUSING_FILE, "housing data")
+    return locations, housing
@@ -0,0 +1,31 @@
+import os
+
+TRUE_VALUES = ("1", "true", "yes", "on")
+FALSE_VALUES = ("0", "false", "no", "off")
+
+def env_flag(name, default=False):
+    """
+    Read an on/off setting from the environment.
+
+    Every flag accepts the same spellings, in any case: 1/true/yes/on and
+    0/false/no/off. An unset or empty variable gives the default.
+
+    Args:
+        name (str): Environment variable name.
+        default (bool): Value when the variable is unset or empty.
+
+    Returns:
+        bool: The flag value.
+
+    Raises:
+        ValueError: If the variable holds anything else, so a typo does not
+            silently leave a feature in its default state.
+    """
+    value = os.environ.get(name, "").strip().lower()
+    if not value:
+        return default
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ValueError(f"{name}={os.environ[name]!r} is not a flag; use one of {TRUE_VALUES + FALSE_VALUES}")
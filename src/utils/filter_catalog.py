@@ -0,0 +1,84 @@
+from types import MappingProxyType
+
+# Cities selected when the dashboard opens and after a reset
+DEFAULT_CITIES = ("Vancouver", "Toronto", "Montreal", "Ottawa")
+
+class FilterCatalog:
+    """
+    Immutable facts about a dataset that the filter controls are built from.
+
+    Scanning the listings once here replaces the unique() and min()/max()
+    passes the sidebar, the city-options callback and the reset callback
+    each made over the whole table. A catalog is built with its DataContext,
+    so reloaded data gets a fresh one.
+
+    Provinces and cities keep their order of first appearance in the data,
+    which is the order the dropdowns list them in.
+
+    Args:
+        df (pd.DataFrame): Listings with City, Province, Number_Beds and Number_Baths.
+    """
+
+    def __init__(self, df):
+        pairs = df[["City", "Province"]].drop_duplicates()
+        self.provinces = tuple(unique_values(df["Province"]))
+        self.cities = tuple(unique_values(df["City"]))
+
+        city_provinces = {}
+        for city, province in zip(pairs["City"], pairs["Province"]):
+            city_provinces.setdefault(city, set()).add(province)
+        self.city_provinces = MappingProxyType({city: frozenset(p) for city, p in city_provinces.items()})
+        self.province_cities = MappingProxyType({
+            province: tuple(city for city in self.cities if province in self.city_provinces[city])
+            for province in self.provinces
+        })
+
+        self.beds_range = column_range(df["Number_Beds"])
+        self.baths_range = column_range(df["Number_Baths"])
+        self.default_cities = tuple(city for city in DEFAULT_CITIES if city in self.city_provinces)
+
+    def __setattr__(self, name, value):
+        if name in self.__dict__:
+            raise AttributeError(f"FilterCatalog is immutable; cannot reassign {name}")
+        super().__setattr__(name, value)
+
+    def city_options(self, selected_provinces=None):
+        """
+        Return the city dropdown options for a province selection.
+
+        Args:
+            selected_provinces: Selected province names; empty or None means all.
+
+        Returns:
+            list: {"label", "value"} options in data order.
+        """
+        if not selected_provinces:
+            cities = self.cities
+        elif len(selected_provinces) == 1:
+            cities = self.province_cities.get(selected_provinces[0], ())
+        else:
+            # A city may lie in several selected provinces; list it once, in data order
+            selected = set().union(*(self.province_cities.get(p, ()) for p in selected_provinces))
+            cities = [city for city in self.cities if city in selected]
+        return [{"label": city, "value": city} for city in cities]
+
+    def province_options(self):
+        """Return the province dropdown options in data order."""
+        return [{"label": province, "value": province} for province in self.provinces]
+
+    def reset_values(self):
+        """
+        Return the default filter values.
+
+        Returns:
+            tuple: (cities, provinces, bedrooms range, bathrooms range).
+        """
+        return list(self.default_cities), [], list(self.beds_range), list(self.baths_range)
+
+def unique_values(series):
+    """Return the distinct non-null values of a Series in order of first appearance."""
+    return series.drop_duplicates().dropna().tolist()
+
+def column_range(series):
+    """Return (min, max) of an integer column as Python ints."""
+    return int(series.min()), int(series.max())
@@ -0,0 +1,101 @@
+import numpy as np
+
+class FilterIndex:
+    """
+    Precomputed row-position index over the housing DataFrame.
+
+    Built once at load time, it answers the dashboard filters with set
+    intersections over row positions instead of copying and scanning the
+    full table:
+        - City / Province: sorted posting lists of row positions per value.
+        - Number_Beds / Number_Baths: row positions ordered by value, so a
+          range resolves to a contiguous slice via binary search.
+
+    Args:
+        df (pd.DataFrame): The housing dataset to index.
+    """
+
+    def __init__(self, df):
+        self.n_rows = len(df)
+        # int32 positions halve the size of postings and cached results
+        self.position_dtype = np.int32 if self.n_rows < 2**31 else np.int64
+        self.postings = {
+            "City": self._build_postings(df["City"]),
+            "Province": self._build_postings(df["Province"]),
+        }
+        self.sorted_positions = {
+            "Number_Beds": self._build_sorted_positions(df["Number_Beds"]),
+            "Number_Baths": self._build_sorted_positions(df["Number_Baths"]),
+        }
+
+    def _build_postings(self, column):
+        """Map each distinct value to the sorted array of rows holding it."""
+        codes, uniques = column.factorize()
+        order = np.argsort(codes, kind="stable").astype(self.position_dtype)
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        return {
+            value: order[bounds[i]:bounds[i + 1]]
+            for i, value in enumerate(uniques)
+        }
+
+    def _build_sorted_positions(self, column):
+        """Return (values sorted ascending, row positions in that order)."""
+        values = column.to_numpy()
+        order = np.argsort(values, kind="stable").astype(self.position_dtype)
+        return values[order], order
+
+    def _match_values(self, column, values):
+        """Sorted row positions whose column is any of the given values."""
+        postings = self.postings[column]
+        lists = [postings[v] for v in values if v in postings]
+        if not lists:
+            return np.empty(0, dtype=self.position_dtype)
+        if len(lists) == 1:
+            return lists[0]
+        return np.sort(np.concatenate(lists))
+
+    def _match_range(self, column, value_range):
+        """Sorted row positions whose column lies in [low, high], or None for all rows."""
+        sorted_values, order = self.sorted_positions[column]
+        low = np.searchsorted(sorted_values, value_range[0], side="left")
+        high = np.searchsorted(sorted_values, value_range[1], side="right")
+        if low == 0 and high == self.n_rows:
+            return None
+        return np.sort(order[low:high])
+
+    def filter(self, selected_cities=(), selected_provinces=(),
+               bedrooms_range=None, bathrooms_range=None):
+        """
+        Resolve a filter state to the matching row positions.
+
+        Args:
+            selected_cities: Iterable of cities (empty means no city filter).
+            selected_provinces: Iterable of provinces (empty means no province filter).
+            bedrooms_range: (min, max) bedrooms, or None for no bound.
+            bathrooms_range: (min, max) bathrooms, or None for no bound.
+
+        Returns:
+            np.ndarray: Ascending row positions, in the original row order.
+        """
+        candidates = []
+        if selected_cities:
+            candidates.append(self._match_values("City", selected_cities))
+        if selected_provinces:
+            candidates.append(self._match_values("Province", selected_provinces))
+        if bedrooms_range is not None:
+            candidates.append(self._match_range("Number_Beds", bedrooms_range))
+        if bathrooms_range is not None:
+            candidates.append(self._match_range("Number_Baths", bathrooms_range))
+
+        candidates = [c for c in candidates if c is not None]
+        if not candidates:
+            return np.arange(self.n_rows, dtype=self.position_dtype)
+
+        # Intersect smallest-first so every step works on the shortest list
+        candidates.sort(key=len)
+        positions = candidates[0]
+        for other in candidates[1:]:
+            if len(positions) == 0:
+                break
+            positions = np.intersect1d(positions, other, assume_unique=True)
+        return positions
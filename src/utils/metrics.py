@@ -0,0 +1,256 @@
+import functools
+import os
+import threading
+import time
+
+from dash.exceptions import PreventUpdate
+from flask import Response, has_request_context, request
+
+from src.utils.data_context import get_data_context
+from src.utils.data_loader import memory_usage
+
+# Upper bounds (seconds) of the callback latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+class CallbackStats:
+    """
+    Latency histogram and payload counters for one callback.
+
+    Args:
+        buckets (tuple): Upper bounds of the latency buckets, in seconds.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.seconds = 0.0
+        self.errors = 0
+        self.prevented = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+    def observe(self, seconds, request_bytes, response_bytes):
+        """Record one completed call."""
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.bucket_counts[i] += 1
+                break
+        self.count += 1
+        self.seconds += seconds
+        self.request_bytes += request_bytes
+        self.response_bytes += response_bytes
+
+class MetricsRegistry:
+    """
+    Per-process metrics, rendered in the Prometheus text format.
+
+    Callback statistics are recorded as calls complete; everything else is
+    read at scrape time from collectors, functions returning metric families
+    as (name, type, help, samples) with samples a list of (labels, value).
+    Under gunicorn each worker keeps its own registry, so a scrape reports
+    the worker that served it (its pid is exported as process_id).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.callbacks = {}
+        self.collectors = []
+
+    def observe_callback(self, name, seconds, request_bytes=0, response_bytes=0, outcome="ok"):
+        """
+        Record one callback call.
+
+        Args:
+            name (str): Callback function name.
+            seconds (float): Wall time of the call.
+            request_bytes (int): Size of the request body.
+            response_bytes (int): Size of the serialized response.
+            outcome (str): "ok", "prevented" (PreventUpdate) or "error".
+        """
+        with self._lock:
+            stats = self.callbacks.setdefault(name, CallbackStats())
+            if outcome == "error":
+                stats.errors += 1
+            elif outcome == "prevented":
+                stats.prevented += 1
+            stats.observe(seconds, request_bytes, response_bytes)
+
+    def add_collector(self, collector):
+        """
+        Report the metric families returned by collector() on every scrape.
+
+        Args:
+            collector (callable): Zero-argument function returning a list of
+                (name, type, help, samples) tuples.
+        """
+        self.collectors.append(collector)
+
+    def callback_families(self):
+        """Return the recorded callback statistics as metric families."""
+        with self._lock:
+            items = sorted(self.callbacks.items())
+            buckets, count, total, errors, prevented, req, resp = [], [], [], [], [], [], []
+            for name, stats in items:
+                labels = {"callback": name}
+                cumulative = 0
+                for bound, n in zip(stats.buckets, stats.bucket_counts):
+                    cumulative += n
+                    buckets.append(({**labels, "le": repr(bound)}, cumulative))
+                buckets.append(({**labels, "le": "+Inf"}, stats.count))
+                count.append((labels, stats.count))
+                total.append((labels, stats.seconds))
+                errors.append((labels, stats.errors))
+                prevented.append((labels, stats.prevented))
+                req.append((labels, stats.request_bytes))
+                resp.append((labels, stats.response_bytes))
+        return [
+            ("dashboard_callback_duration_seconds", "histogram", "Callback wall time.",
+             [("_bucket", labels, v) for labels, v in buckets]
+             + [("_count", labels, v) for labels, v in count]
+             + [("_sum", labels, v) for labels, v in total]),
+            ("dashboard_callback_errors_total", "counter", "Callback calls that raised.", errors),
+            ("dashboard_callback_prevented_total", "counter", "Callback calls that raised PreventUpdate.", prevented),
+            ("dashboard_callback_request_bytes_total", "counter", "Request body bytes received by callbacks.", req),
+            ("dashboard_callback_response_bytes_total", "counter", "Serialized response bytes returned by callbacks.", resp),
+        ]
+
+    def render(self):
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: The exposition text.
+        """
+        families = self.callback_families()
+        for collector in list(self.collectors):
+            families.extend(collector())
+        lines = []
+        for name, kind, help_text, samples in families:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample in samples:
+                suffix, labels, value = sample if len(sample) == 3 else ("", *sample)
+                lines.append(f"{name}{suffix}{format_labels(labels)} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+def format_labels(labels):
+    """Format a label dict as {name="value",...} (empty for no labels)."""
+    if not labels:
+        return ""
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in labels.items()) + "}"
+
+def format_value(value):
+    """Format a sample value; integers without a decimal point."""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+def instrument_callback(name, callback, registry):
+    """
+    Wrap a Dash callback so each call is timed and its payload sizes counted.
+
+    Args:
+        name (str): Callback name reported in the metrics.
+        callback (callable): The function stored in app.callback_map.
+        registry (MetricsRegistry): Where the measurements are recorded.
+
+    Returns:
+        callable: The instrumented callback.
+    """
+    @functools.wraps(callback)
+    def timed(*args, **kwargs):
+        request_bytes = (request.content_length or 0) if has_request_context() else 0
+        start = time.perf_counter()
+        outcome, response = "error", None
+        try:
+            response = callback(*args, **kwargs)
+            outcome = "ok"
+            return response
+        except PreventUpdate:
+            outcome = "prevented"
+            raise
+        finally:
+            response_bytes = len(response) if isinstance(response, (str, bytes)) else 0
+            registry.observe_callback(name, time.perf_counter() - start, request_bytes, response_bytes, outcome)
+
+    return timed
+
+def instrument_callbacks(app, registry):
+    """
+    Instrument every callback registered on app.
+
+    Call after all callbacks are registered.
+
+    Args:
+        app (Dash): The Dash application.
+        registry (MetricsRegistry): Where the measurements are recorded.
+    """
+    for entry in app.callback_map.values():
+        callback = entry["callback"]
+        name = getattr(getattr(callback, "__wrapped__", callback), "__name__", "callback")
+        entry["callback"] = instrument_callback(name, callback, registry)
+
+def resident_memory_bytes():
+    """Return the resident set size of this process, or None where unavailable."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # Peak, in KiB on Linux
+    except (ImportError, AttributeError):
+        return None
+
+def collect_data_context():
+    """Report the dataset size and the result caches of the current data context."""
+    context = get_data_context()
+    tables = {"housing": context.housing, "locations": context.locations}
+    caches = {"filter": context.filter_cache.stats(), "aggregate": context.aggregate_cache.stats()}
+
+    def cache_samples(field):
+        return [({"cache": name}, stats[field]) for name, stats in caches.items()]
+
+    # Caches belong to the context, so their counters restart when new data is swapped in
+    return [
+        ("dashboard_dataset_rows", "gauge", "Rows in each loaded table.",
+         [({"table": name}, len(df)) for name, df in tables.items()]),
+        ("dashboard_dataset_memory_bytes", "gauge", "Deep memory usage of each loaded table.",
+         [({"table": name}, memory_usage(df)) for name, df in tables.items()]),
+        ("dashboard_cache_hits_total", "counter", "Result cache hits.", cache_samples("hits")),
+        ("dashboard_cache_misses_total", "counter", "Result cache misses.", cache_samples("misses")),
+        ("dashboard_cache_evictions_total", "counter", "Result cache evictions.", cache_samples("evictions")),
+        ("dashboard_cache_entries", "gauge", "Entries held by each result cache.", cache_samples("entries")),
+        ("dashboard_cache_bytes", "gauge", "Bytes held by each result cache.", cache_samples("bytes")),
+        ("dashboard_cache_max_bytes", "gauge", "Byte budget of each result cache.", cache_samples("max_bytes")),
+    ]
+
+def collect_process():
+    """Report this process's id and resident memory."""
+    families = [("process_id", "gauge", "Process id of the worker serving this scrape.", [({}, os.getpid())])]
+    rss = resident_memory_bytes()
+    if rss is not None:
+        families.append(("process_resident_memory_bytes", "gauge", "Resident memory size in bytes.", [({}, rss)]))
+    return families
+
+registry = MetricsRegistry()
+registry.add_collector(collect_data_context)
+registry.add_collector(collect_process)
+
+def register_metrics(app, path="/metrics"):
+    """
+    Instrument the app's callbacks and serve the metrics at path.
+
+    Args:
+        app (Dash): The Dash application, with every callback registered.
+        path (str): URL of the metrics route on app.server.
+    """
+    instrument_callbacks(app, registry)
+
+    @app.server.route(path)
+    def metrics():
+        return Response(registry.render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,150 @@
+import cProfile
+import functools
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from flask import has_request_context, request
+
+from src.utils.env import env_flag
+
+logger = logging.getLogger(__name__)
+
+# Fraction of callback calls to profile (0 disables sampling)
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+
+# Also profile any request sent with the PROFILE_HEADER header (off by default)
+PROFILE_ALLOW_HEADER = env_flag("PROFILE_ALLOW_HEADER")
+PROFILE_HEADER = "X-Profile"
+
+# Where profiles are written, and how many are kept (oldest are deleted first)
+PROFILE_DIR = Path(os.environ.get("PROFILE_DIR", Path(tempfile.gettempdir()) / "dashboard-profiles"))
+PROFILE_MAX_FILES = int(os.environ.get("PROFILE_MAX_FILES", "200"))
+
+def profiling_enabled(sample_rate=None, allow_header=None):
+    """Whether callbacks should be instrumented for profiling at all."""
+    sample_rate = PROFILE_SAMPLE_RATE if sample_rate is None else sample_rate
+    allow_header = PROFILE_ALLOW_HEADER if allow_header is None else allow_header
+    return sample_rate > 0 or allow_header
+
+class ProfileWriter:
+    """
+    Writes cProfile results with a JSON description, keeping the newest max_files.
+
+    Each profile is a pstats file (open with `python -m pstats` or snakeviz)
+    next to a .json file naming the callback, its inputs and its duration.
+
+    Args:
+        directory (Path): Output directory, created on first write.
+        max_files (int): Number of profiles to keep.
+    """
+
+    def __init__(self, directory=PROFILE_DIR, max_files=PROFILE_MAX_FILES):
+        self.directory = Path(directory)
+        self.max_files = max_files
+        self._lock = threading.Lock()
+
+    def write(self, profiler, name, inputs, seconds):
+        """
+        Save one profile and rotate out the oldest ones.
+
+        Args:
+            profiler (cProfile.Profile): A disabled profiler.
+            name (str): Callback name.
+            inputs (list): The callback's input values.
+            seconds (float): Wall time of the profiled call.
+
+        Returns:
+            Path: The written pstats file.
+        """
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S.%f")
+        path = self.directory / f"{stamp}_{os.getpid()}_{name}.prof"
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(path)
+            path.with_suffix(".json").write_text(json.dumps({
+                "callback": name, "inputs": inputs, "seconds": seconds, "pid": os.getpid(), "time": stamp,
+            }, default=str))
+            self.rotate()
+        return path
+
+    def rotate(self):
+        """Delete the oldest profiles beyond max_files."""
+        profiles = sorted(self.directory.glob("*.prof"))
+        for old in profiles[:max(len(profiles) - self.max_files, 0)]:
+            old.unlink(missing_ok=True)
+            old.with_suffix(".json").unlink(missing_ok=True)
+
+def header_requested():
+    """Whether the current request asks to be profiled."""
+    return has_request_context() and request.headers.get(PROFILE_HEADER, "").lower() in ("1", "true", "yes")
+
+def profile_callback(name, callback, writer, sample_rate=PROFILE_SAMPLE_RATE, allow_header=PROFILE_ALLOW_HEADER):
+    """
+    Wrap a Dash callback so a sample of its calls run under cProfile.
+
+    Args:
+        name (str): Callback name used to tag the profiles.
+        callback (callable): The function stored in app.callback_map.
+        writer (ProfileWriter): Where profiles are written.
+        sample_rate (float): Fraction of calls to profile.
+        allow_header (bool): Also profile requests carrying PROFILE_HEADER.
+
+    Returns:
+        callable: The wrapped callback.
+    """
+    @functools.wraps(callback)
+    def sampled(*args, **kwargs):
+        if not (random.random() < sample_rate or (allow_header and header_requested())):
+            return callback(*args, **kwargs)
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            return callback(*args, **kwargs)
+        finally:
+            profiler.disable()
+            seconds = time.perf_counter() - start
+            try:
+                path = writer.write(profiler, name, list(args), seconds)
+                logger.info("Profiled %s (%.1f ms) to %s", name, seconds * 1000, path)
+            except OSError:
+                logger.exception("Could not write the profile of %s", name)
+
+    return sampled
+
+def register_profiling(app, sample_rate=None, allow_header=None, writer=None):
+    """
+    Profile a sample of the app's callbacks, if profiling is configured.
+
+    When PROFILE_SAMPLE_RATE is 0 and PROFILE_ALLOW_HEADER is off (the
+    default), the callbacks are left untouched, so profiling costs nothing.
+    Call after all callbacks are registered.
+
+    Args:
+        app (Dash): The Dash application.
+        sample_rate (float): Overrides PROFILE_SAMPLE_RATE.
+        allow_header (bool): Overrides PROFILE_ALLOW_HEADER.
+        writer (ProfileWriter): Overrides the default writer (PROFILE_DIR, PROFILE_MAX_FILES).
+
+    Returns:
+        bool: Whether the callbacks were wrapped.
+    """
+    sample_rate = PROFILE_SAMPLE_RATE if sample_rate is None else sample_rate
+    allow_header = PROFILE_ALLOW_HEADER if allow_header is None else allow_header
+    if not profiling_enabled(sample_rate, allow_header):
+        return False
+    writer = writer or ProfileWriter()
+    for entry in app.callback_map.values():
+        callback = entry["callback"]
+        name = getattr(getattr(callback, "__wrapped__", callback), "__name__", "callback")
+        entry["callback"] = profile_callback(name, callback, writer, sample_rate, allow_header)
+    logger.info("Profiling %.1f%% of callback calls%s to %s", sample_rate * 100,
+                f" and requests with {PROFILE_HEADER}" if allow_header else "", writer.directory)
+    return True
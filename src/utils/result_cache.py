@@ -0,0 +1,161 @@
+import os
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+def estimate_nbytes(value):
+    """
+    Estimate the memory held by a cached value.
+
+    Args:
+        value: A NumPy array, pandas object, or any other Python object.
+
+    Returns:
+        int: Approximate size in bytes.
+    """
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(estimate_nbytes(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_nbytes(v) for v in value.values())
+    return sys.getsizeof(value)
+
+class ResultCache:
+    """
+    Thread-safe LRU cache bounded by the total bytes of its values.
+
+    Unlike functools.lru_cache, which bounds the number of entries, this cache
+    evicts least-recently-used entries until the summed size of the stored
+    values fits within max_bytes. Values larger than the whole budget are
+    returned but never stored. Concurrent get_or_compute calls for the same
+    missing key compute it once; the others wait for that result.
+
+    The locks are replaced in forked children (e.g. background callback
+    jobs), which would otherwise inherit any lock another thread held at
+    fork time and wait on it forever.
+
+    Args:
+        max_bytes (int): Memory budget for the cached values.
+        sizeof (callable): Function returning the size of a value in bytes.
+    """
+
+    def __init__(self, max_bytes, sizeof=estimate_nbytes):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._entries = OrderedDict()
+        self._reset_locks()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        _instances.add(self)
+
+    def _reset_locks(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+
+    def get(self, key, default=None):
+        """Return the cached value for key (marking it recently used), or default."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """Store value under key, evicting least-recently-used entries as needed."""
+        nbytes = self.sizeof(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            if nbytes > self.max_bytes:
+                return
+            while self._entries and self.current_bytes + nbytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_bytes
+                self.evictions += 1
+            self._entries[key] = (value, nbytes)
+            self.current_bytes += nbytes
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached value for key, computing and storing it on a miss.
+
+        Only one thread computes a given key at a time; threads missing on the
+        same key meanwhile wait and then reuse its result.
+
+        Args:
+            key: Hashable cache key.
+            compute (callable): Zero-argument function producing the value.
+
+        Returns:
+            The cached or freshly computed value.
+        """
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is not sentinel:
+            return value
+        with self._lock:
+            flight = self._in_flight.setdefault(key, threading.Lock())
+        with flight:
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is not None:
+                return entry[0]
+            try:
+                value = compute()
+                self.put(key, value)
+            finally:
+                with self._lock:
+                    self._in_flight.pop(key, None)
+        return value
+
+    def clear(self):
+        """Drop every entry. Hit, miss and eviction counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """
+        Report the cache size and effectiveness.
+
+        Returns:
+            dict: entries, bytes, max_bytes, hits, misses and evictions.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+_instances = weakref.WeakSet()
+
+def _reset_after_fork():
+    for cache in list(_instances):
+        cache._reset_locks()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
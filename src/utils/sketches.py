@@ -0,0 +1,136 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from src.utils.aggregates import CellLayout
+
+class QuantileSketchSet:
+    """
+    Mergeable per-cell quantile sketches of listing prices.
+
+    Every cell of a CellLayout keeps a weighted summary of its sorted prices:
+    cells with at most k = ceil(1 / epsilon) listings keep every price, larger
+    cells keep k block representatives weighted by block size, plus their
+    exact min and max with zero weight. A block is at most epsilon * n
+    listings wide, so each summary is off by at most epsilon * n ranks, and a
+    merge (concatenating summaries) keeps the error within epsilon times the
+    merged count. Queries therefore cost O(selected cells * k), independent of
+    the number of listings.
+
+    Args:
+        df (pd.DataFrame): The housing dataset to summarize.
+        epsilon (float): Relative rank error bound of each summary.
+        layout (CellLayout): Cell coordinates to use, built from df if omitted.
+    """
+
+    def __init__(self, df, epsilon=0.01, layout=None):
+        self.epsilon = epsilon
+        self.layout = layout or CellLayout(df)
+        k = max(1, math.ceil(1 / epsilon))
+
+        cell = self.layout.cell_codes(df)
+        price = df["Price"].to_numpy().astype(np.float64)
+        order = np.lexsort((price, cell))
+        cell, price = cell[order], price[order]
+        bounds = np.searchsorted(cell, np.arange(self.layout.size + 1))
+
+        values, weights = [], []
+        lengths = np.zeros(self.layout.size, dtype=np.int64)
+        for c in np.flatnonzero(np.diff(bounds)):
+            cell_prices = price[bounds[c]:bounds[c + 1]]
+            n = len(cell_prices)
+            if n <= k:
+                cell_values, cell_weights = cell_prices, np.ones(n)
+            else:
+                edges = np.linspace(0, n, k + 1).round().astype(np.int64)
+                middle = cell_prices[(edges[:-1] + edges[1:] - 1) // 2]
+                cell_values = np.concatenate(([cell_prices[0]], middle, [cell_prices[-1]]))
+                cell_weights = np.concatenate(([0.0], np.diff(edges).astype(np.float64), [0.0]))
+            values.append(cell_values)
+            weights.append(cell_weights)
+            lengths[c] = len(cell_values)
+
+        self.offsets = np.concatenate(([0], np.cumsum(lengths)))
+        self.values = np.concatenate(values) if values else np.empty(0)
+        self.weights = np.concatenate(weights) if weights else np.empty(0)
+
+    def _gather(self, cells):
+        """Return (centroid positions, owning cell) for the selected cells."""
+        starts, stops = self.offsets[cells], self.offsets[cells + 1]
+        lengths = stops - starts
+        owner = np.repeat(cells, lengths)
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        return positions, owner
+
+    @staticmethod
+    def _weighted_quantiles(values, weights, qs):
+        """
+        Interpolate quantiles from value-sorted weighted centroids.
+
+        Each centroid sits at the centre of the ranks it covers, which matches
+        pandas' linear interpolation exactly when every weight is one.
+        """
+        counted = weights > 0
+        centers = np.cumsum(weights[counted]) - (weights[counted] + 1) / 2
+        total = weights.sum()
+        return np.interp(np.asarray(qs) * (total - 1), centers, values[counted])
+
+    def quantile(self, cells, q):
+        """
+        Approximate a price quantile over the union of the selected cells.
+
+        Args:
+            cells (np.ndarray): Flat cell indices, e.g. from CellLayout.select_cells.
+            q (float): Quantile in [0, 1].
+
+        Returns:
+            float: The approximate quantile, or None when the cells are empty.
+        """
+        positions, _ = self._gather(cells)
+        if self.weights[positions].sum() == 0:
+            return None
+        order = np.argsort(self.values[positions], kind="stable")
+        return float(self._weighted_quantiles(self.values[positions][order],
+                                              self.weights[positions][order], [q])[0])
+
+    def boxplot_stats(self, cells, group_col):
+        """
+        Approximate boxplot statistics per group from the merged cell sketches.
+
+        Args:
+            cells (np.ndarray): Flat cell indices of the filter state.
+            group_col (str): Column to group by, "City" or "Number_Beds".
+
+        Returns:
+            pd.DataFrame: One row per group with count, Q1, median, Q3, IQR,
+            whisker_low_limit, whisker_high_limit, Min and Max.
+        """
+        positions, owner = self._gather(cells)
+        labels = self.layout.cell_labels(owner, group_col)
+        values, weights = self.values[positions], self.weights[positions]
+        codes, groups = pd.factorize(labels, sort=True)
+        order = np.lexsort((values, codes))
+        values, weights, codes = values[order], weights[order], codes[order]
+        bounds = np.searchsorted(codes, np.arange(len(groups) + 1))
+
+        rows = []
+        for i, group in enumerate(groups):
+            group_values = values[bounds[i]:bounds[i + 1]]
+            group_weights = weights[bounds[i]:bounds[i + 1]]
+            count = group_weights.sum()
+            if count == 0:
+                continue
+            q1, median, q3 = self._weighted_quantiles(group_values, group_weights, (0.25, 0.5, 0.75))
+            iqr = q3 - q1
+            low_limit, high_limit = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+            inside = group_values[(group_values >= low_limit) & (group_values <= high_limit)]
+            if len(inside) == 0:
+                inside = group_values
+            rows.append({
+                group_col: group, "count": count, "Q1": q1, "median": median, "Q3": q3,
+                "IQR": iqr, "whisker_low_limit": low_limit, "whisker_high_limit": high_limit,
+                "Min": inside.min(), "Max": inside.max(),
+            })
+        return pd.DataFrame(rows, columns=[group_col, "count", "Q1", "median", "Q3", "IQR",
+                                           "whisker_low_limit", "whisker_high_limit", "Min", "Max"])
@@ -0,0 +1,51 @@
+import threading
+
+class SpecTemplate:
+    """
+    A Vega spec compiled once from an Altair chart and re-rendered with new data.
+
+    The chart is built and compiled (including schema validation) on first use
+    only. Its data sources should be named placeholders, e.g.
+    alt.Data(name="stats"); render() then swaps the inline values of those
+    datasets into a shallow copy of the compiled spec, so per-request cost is
+    independent of the chart's complexity.
+
+    Args:
+        build (callable): Zero-argument function returning the Altair chart.
+        finalize (callable): Optional function applied once to the compiled spec.
+    """
+
+    def __init__(self, build, finalize=None):
+        self._build = build
+        self._finalize = finalize
+        self._spec = None
+        self._lock = threading.Lock()
+
+    @property
+    def spec(self):
+        """The compiled Vega spec (compiled on first access)."""
+        if self._spec is None:
+            with self._lock:
+                if self._spec is None:
+                    spec = self._build().to_dict(format="vega")
+                    if self._finalize is not None:
+                        spec = self._finalize(spec) or spec
+                    self._spec = spec
+        return self._spec
+
+    def render(self, **datasets):
+        """
+        Return the compiled spec with the given named datasets filled in.
+
+        Args:
+            **datasets: Mapping of dataset name to a list of records.
+
+        Returns:
+            dict: A Vega spec sharing every unchanged part with the template.
+        """
+        spec = dict(self.spec)
+        spec["data"] = [
+            {**dataset, "values": datasets[dataset["name"]]} if dataset.get("name") in datasets else dataset
+            for dataset in spec.get("data", [])
+        ]
+        return spec
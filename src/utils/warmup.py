@@ -0,0 +1,235 @@
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+
+from src.callbacks.charts import encode_filter_key, get_filter_aggregates
+from src.utils.background import BACKGROUND_CALLBACKS
+from src.utils.data_context import add_reload_listener, get_data_context
+from src.utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Filter states to precompute: any of "default", "all", "provinces" (one per
+# province) and "cities" (one per city); empty disables the warm-up. The default
+# skips single cities, which are small selections and quick to aggregate on demand
+WARMUP_STATES = [s.strip() for s in os.environ.get("WARMUP_STATES", "default,all,provinces").split(",") if s.strip()]
+
+# Warm-up threads per worker; they compete with requests for the GIL, so one is enough
+WARMUP_THREADS = int(os.environ.get("WARMUP_THREADS", "1"))
+
+# Optional JSON list of popular filter states, warmed right after the default one, e.g.
+# [{"cities": ["Calgary"], "provinces": [], "bedrooms": [2, 4], "bathrooms": [1, 3]}]
+WARMUP_QUERIES_FILE = os.environ.get("WARMUP_QUERIES_FILE")
+
+def load_queries(path, catalog):
+    """
+    Read popular filter states from a JSON file.
+
+    Args:
+        path (str): File holding a list of objects with optional cities,
+            provinces, bedrooms and bathrooms keys.
+        catalog (FilterCatalog): Supplies the full ranges for missing sliders.
+
+    Returns:
+        list: Filter states as (cities, provinces, bedrooms, bathrooms).
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            queries = json.load(f)
+    except (OSError, ValueError):
+        logger.exception("Could not read warm-up queries from %s", path)
+        return []
+    return [(q.get("cities", []), q.get("provinces", []),
+             q.get("bedrooms", list(catalog.beds_range)), q.get("bathrooms", list(catalog.baths_range)))
+            for q in queries]
+
+def filter_states(catalog, kinds=None, queries_file=None):
+    """
+    List the filter-state keys to warm, most popular first.
+
+    Args:
+        catalog (FilterCatalog): Catalog of the dataset being warmed.
+        kinds (list): Overrides WARMUP_STATES.
+        queries_file (str): Overrides WARMUP_QUERIES_FILE.
+
+    Returns:
+        list: Distinct filter-signature keys.
+    """
+    kinds = WARMUP_STATES if kinds is None else kinds
+    queries_file = WARMUP_QUERIES_FILE if queries_file is None else queries_file
+    beds, baths = list(catalog.beds_range), list(catalog.baths_range)
+    states = []
+    for kind in kinds:
+        if kind == "default":
+            states.append((list(catalog.default_cities), [], beds, baths))
+            if queries_file:
+                states.extend(load_queries(queries_file, catalog))
+        elif kind == "all":
+            states.append(([], [], beds, baths))
+        elif kind == "provinces":
+            states.extend(([], [province], beds, baths) for province in catalog.provinces)
+        elif kind == "cities":
+            states.extend(([city], [], beds, baths) for city in catalog.cities)
+        else:
+            logger.warning("Ignoring unknown warm-up state kind %r", kind)
+    return list(dict.fromkeys(encode_filter_key(*state) for state in states))
+
+def chart_callbacks(app):
+    """Return the undecorated callbacks that render from the filtered-data store."""
+    return [inspect.unwrap(entry["callback"]) for entry in app.callback_map.values()
+            if [(i["id"], i["property"]) for i in entry["inputs"]] == [("filtered-data", "data")]]
+
+def warm_state(key, context, callbacks=()):
+    """
+    Cache one filter state's aggregates, and optionally render it through chart callbacks.
+
+    The callbacks read the current data context, so they are skipped if
+    context has been replaced by a reload in the meantime.
+
+    Args:
+        key (str): Filter-signature key.
+        context (DataContext): Context whose caches are filled.
+        callbacks (list): Callbacks from chart_callbacks() to run once on the state.
+
+    Returns:
+        bool: Whether every step succeeded (failures are logged).
+    """
+    try:
+        get_filter_aggregates(key, context)
+        if callbacks and get_data_context() is context:
+            for callback in callbacks:
+                callback(key)
+    except Exception:
+        logger.exception("Warming filter state %s failed", key)
+        return False
+    return True
+
+class WarmupProgress:
+    """Progress of the latest warm-up run, reported through /metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.planned = self.done = self.failed = 0
+        self.started = self.finished = None
+
+    def start(self, planned):
+        """Begin a new run, superseding any run still in progress; return its generation."""
+        with self._lock:
+            self.generation += 1
+            self.planned, self.done, self.failed = planned, 0, 0
+            self.started, self.finished = time.monotonic(), None
+            return self.generation
+
+    def record(self, generation, ok):
+        """
+        Count one finished state of the given run.
+
+        Returns:
+            Seconds the run took if this was its last state, 0 if more remain,
+            or None if a newer run has started.
+        """
+        with self._lock:
+            if generation != self.generation:
+                return None
+            if ok:
+                self.done += 1
+            else:
+                self.failed += 1
+            if self.done + self.failed < self.planned:
+                return 0
+            self.finished = time.monotonic()
+            return self.finished - self.started
+
+    def is_current(self, generation):
+        """Whether generation is the latest run."""
+        return generation == self.generation
+
+    def collect(self):
+        """Metric families for MetricsRegistry.add_collector."""
+        with self._lock:
+            running = self.started is not None and self.finished is None
+            elapsed = ((self.finished or time.monotonic()) - self.started) if self.started is not None else 0
+            return [
+                ("dashboard_warmup_states", "gauge", "Filter states of the latest cache warm-up run.",
+                 [({"status": "planned"}, self.planned), ({"status": "done"}, self.done),
+                  ({"status": "failed"}, self.failed)]),
+                ("dashboard_warmup_running", "gauge", "Whether a cache warm-up run is in progress.",
+                 [({}, int(running))]),
+                ("dashboard_warmup_duration_seconds", "gauge", "Duration of the latest warm-up run so far.",
+                 [({}, elapsed)]),
+            ]
+
+progress = WarmupProgress()
+registry.add_collector(progress.collect)
+
+def start_warmup(app, context=None, keys=None, threads=WARMUP_THREADS):
+    """
+    Precompute the aggregates of popular filter states in the background.
+
+    Each state's aggregates go into the context's caches. Only the first
+    state is also rendered through the chart callbacks, which compiles the
+    chart templates and imports the chart libraries before the first user
+    needs them; rendering the rest would produce specs nothing keeps.
+    Requests are served meanwhile; a later run (e.g. after a data reload)
+    supersedes this one, whose threads then stop.
+
+    Args:
+        app (Dash): The app whose chart callbacks are warmed.
+        context (DataContext): Context to warm; defaults to the current one.
+        keys (list): Filter-signature keys; defaults to filter_states(context.catalog).
+        threads (int): Number of warm-up threads.
+
+    Returns:
+        list: The started daemon threads (empty if there is nothing to warm).
+    """
+    context = context or get_data_context()
+    keys = filter_states(context.catalog) if keys is None else keys
+    if not keys or threads < 1:
+        return []
+    callbacks = chart_callbacks(app)
+    generation = progress.start(len(keys))
+    pending = iter(keys)
+    pending_lock = threading.Lock()
+
+    def work():
+        while progress.is_current(generation) and get_data_context() is context:
+            with pending_lock:
+                key = next(pending, None)
+            if key is None:
+                return
+            render = callbacks if key == keys[0] else ()
+            seconds = progress.record(generation, warm_state(key, context, render))
+            if seconds is None:
+                return
+            if seconds:
+                logger.info("Warmed %d filter states in %.1f s", len(keys), seconds)
+
+    workers = [threading.Thread(target=work, name=f"cache-warmup-{n}", daemon=True) for n in range(threads)]
+    for worker in workers:
+        worker.start()
+    return workers
+
+def enable_warmup(app):
+    """
+    Warm the caches now and again whenever new data is swapped in.
+
+    Threads do not survive fork, so call this in each serving process (see
+    gunicorn.conf.py), not in a preloading master, and before starting any
+    other thread: with BACKGROUND_CALLBACKS on, the default state is first
+    warmed in the calling thread. Background jobs are forked from this
+    process, and a job forked while another thread is importing a module
+    it needs deadlocks on the import lock, so the aggregation code is run
+    once before any thread can be importing anything.
+
+    Args:
+        app (Dash): The Dash application.
+    """
+    if BACKGROUND_CALLBACKS:
+        context = get_data_context()
+        warm_state(encode_filter_key(*context.catalog.reset_values()), context, chart_callbacks(app))
+    add_reload_listener(lambda context: start_warmup(app, context))
+    start_warmup(app)
@@ -1,6 +1,36 @@
 from src.app import app
+from benchmarks.startup import measure_import, LAZY_MODULES
 from dash import Dash
 
 def test_app_instance():
     assert isinstance(app, Dash)
     assert app.title is not None
+
+def test_app_import_defers_chart_backends():
+    """Chart backends are imported on first render, not when the app starts."""
+    _, imported = measure_import("src.app")
+    assert not [m for m in LAZY_MODULES if m in imported]
+
+def test_metrics_endpoint_reports_callbacks_and_caches():
+    client = app.server.test_client()
+    payload = {
+        "output": "filtered-data.data",
+        "outputs": {"id": "filtered-data", "property": "data"},
+        "inputs": [
+            {"id": "city-filter", "property": "value", "value": ["Toronto"]},
+            {"id": "province-filter", "property": "value", "value": []},
+            {"id": "bedrooms-slider", "property": "value", "value": [0, 10]},
+            {"id": "bathrooms-slider", "property": "value", "value": [0, 10]},
+        ],
+        "changedPropIds": ["city-filter.value"],
+        "state": [],
+    }
+    assert client.post("/_dash-update-component", json=payload).status_code == 200
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    text = response.get_data(as_text=True)
+    assert 'dashboard_callback_duration_seconds_count{callback="update_filtered_data"}' in text
+    assert 'dashboard_callback_response_bytes_total{callback="update_filtered_data"}' in text
+    assert 'dashboard_cache_misses_total{cache="aggregate"}' in text
+    assert 'dashboard_dataset_memory_bytes{table="housing"}' in text
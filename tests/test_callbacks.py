@@ -1,6 +1,11 @@
+import json
 import pytest
 import pandas as pd
-from src.callbacks.charts import get_filtered_data
+from src.callbacks.charts import (get_filtered_data, encode_filter_key, compute_boxplot_stats, build_map,
+                                  get_filter_aggregates, downsample_outliers, CHART1_TEMPLATE)
+from benchmarks.bench_boxplot import make_listings, reference_compute_boxplot_stats
+from src.utils.data_context import DataContext, get_data_context
+from src.utils.spec_templates import SpecTemplate
 
 @pytest.fixture
 def sample_df():
@@ -13,16 +18,181 @@ def sample_df():
         "Price": [800000, 900000, 750000]
     })
 
-def test_get_filtered_data(sample_df, monkeypatch):
+def test_get_filtered_data(sample_df):
     """Test the get_filtered_data function with sample filters."""
     
-    # Patch the global df to use the sample dataframe
-    monkeypatch.setattr("src.callbacks.charts.df", sample_df)
+    # Filter a data context built from the sample dataframe
+    context = DataContext(pd.DataFrame(columns=["Province", "City", "Latitude", "Longitude"]), sample_df)
 
-    filtered_data = get_filtered_data(("Vancouver",), ("BC",), (2, 4), (1, 3))
+    filtered_data = get_filtered_data(("Vancouver",), ("BC",), (2, 4), (1, 3), context=context)
     
     assert not filtered_data.empty
     assert all(filtered_data["City"] == "Vancouver")
     assert all(filtered_data["Province"] == "BC")
     assert all(filtered_data["Number_Beds"].between(2, 4))
     assert all(filtered_data["Number_Baths"].between(1, 3))
+
+def test_filter_key_is_canonical():
+    """Test that equivalent filter states share one compact key."""
+    key_a = encode_filter_key(["Toronto", "Vancouver"], None, [1, 5], [1, 3])
+    key_b = encode_filter_key(["Vancouver", "Toronto"], [], (1, 5), (1, 3))
+
+    assert key_a == key_b
+    assert len(key_a) < 100
+
+@pytest.mark.parametrize("group_col", ["City", "Number_Beds"])
+def test_compute_boxplot_stats_matches_reference(group_col):
+    """Test the vectorized boxplot statistics against the describe/merge implementation."""
+    df = make_listings(2000, n_cities=7)
+    stats, flagged = compute_boxplot_stats(df, group_col)
+    expected_stats, expected_flagged = reference_compute_boxplot_stats(df, group_col)
+
+    pd.testing.assert_frame_equal(stats, expected_stats, check_dtype=False)
+    assert flagged["is_outlier"].tolist() == expected_flagged["is_outlier"].tolist()
+
+def test_map_template_references_static_base_map():
+    """Test that map specs reference the static base map and only inline the markers."""
+    template = SpecTemplate(lambda: build_map("/assets/canada_provinces.geojson?m=1"))
+    spec = template.render(markers=[{"City": "Toronto", "Price": 899000.0, "Number_Beds": 2.7,
+                                     "Latitude": 43.74, "Longitude": -79.37}])
+
+    datasets = {d["name"]: d for d in spec["data"]}
+    assert any(d.get("url") == "/assets/canada_provinces.geojson?m=1" for d in spec["data"])
+    assert datasets["markers"]["values"][0]["City"] == "Toronto"
+    assert "values" not in template.spec["data"][0]  # The compiled template itself is never mutated
+
+@pytest.mark.parametrize("bedrooms_range,bathrooms_range", [
+    ([20, 30], [1, 2]),   # Both bounds above the largest value
+    ([-5, -1], [1, 2]),   # Both bounds below the smallest value
+    ([4, 2], [1, 3]),     # Inverted range
+    ([0, 100], [3, 1]),
+])
+def test_cube_and_cells_handle_out_of_range_sliders(bedrooms_range, bathrooms_range):
+    """Test that out-of-range and inverted slider ranges select what get_filtered_data selects."""
+    context = get_data_context()
+    rows = get_filtered_data((), (), tuple(bedrooms_range), tuple(bathrooms_range))
+    assert context.cube.summarize((), (), bedrooms_range, bathrooms_range)["count"] == len(rows)
+    cells = context.cube.layout.select_cells((), (), bedrooms_range, bathrooms_range)
+    assert context.cube.count.ravel()[cells].sum() == len(rows)
+
+def test_filter_aggregates_feed_every_output_from_one_computation():
+    """Test that one filter state is aggregated once and matches the filtered rows."""
+    df_housing = get_data_context().housing
+    context = DataContext(get_data_context().locations, df_housing)
+    key = encode_filter_key(["Toronto", "Vancouver"], None, [1, 5], [1, 5])
+    aggregates = get_filter_aggregates(key, context)
+    assert get_filter_aggregates(key, context) is aggregates
+
+    rows = df_housing[df_housing["City"].isin(["Toronto", "Vancouver"])
+                      & df_housing["Number_Beds"].between(1, 5) & df_housing["Number_Baths"].between(1, 5)]
+    assert aggregates["count"] == len(rows)
+    assert aggregates["summary"]["median_price"] == pytest.approx(rows["Price"].median())
+    assert {r["City"] for r in aggregates["map_markers"]} == {"Toronto", "Vancouver"}
+    assert aggregates["city_ratios"]["City"].tolist() == ["Toronto", "Vancouver"]
+    assert get_filter_aggregates(encode_filter_key(["Nowhere"], None, [1, 5], [1, 5]), context) == {"count": 0}
+
+def test_aggregates_computed_in_a_job_are_shared_through_the_store(tmp_path, monkeypatch):
+    """Test that a worker reads aggregates a background job left in the store instead of recomputing."""
+    diskcache = pytest.importorskip("diskcache")
+    from src.callbacks import charts
+
+    store = diskcache.Cache(str(tmp_path))
+    monkeypatch.setattr(charts, "get_aggregate_store", lambda: store)
+    base = get_data_context()
+    key = encode_filter_key(["Toronto"], None, [1, 5], [1, 5])
+
+    job = DataContext(base.locations, base.housing, data_dir=tmp_path, version=((1, 2),))
+    computed = get_filter_aggregates(key, job)
+    assert len(store) == 1
+
+    worker = DataContext(base.locations, base.housing, data_dir=tmp_path, version=((1, 2),))
+    monkeypatch.setattr(charts, "compute_filter_aggregates", lambda *args: pytest.fail("recomputed"))
+    assert get_filter_aggregates(key, worker)["count"] == computed["count"]
+
+    reloaded = DataContext(base.locations, base.housing, data_dir=tmp_path, version=((3, 4),))
+    with pytest.raises(pytest.fail.Exception):
+        get_filter_aggregates(key, reloaded)  # New data files never read the old aggregates
+
+# Largest acceptable (raw JSON, gzipped) response per output, with every listing selected
+RESPONSE_BUDGETS = {
+    "..median-price.children...avg-bedrooms.children...avg-bathrooms.children...price-range.children..": (2_000, 500),
+    "chart1.spec": (150_000, 12_000),
+    "chart2.spec": (32_000, 5_000),
+    "chart3.figure": (16_000, 4_000),
+    "map.spec": (12_000, 4_000),
+}
+
+@pytest.mark.parametrize("header,expected", [
+    ("gzip, deflate, br", True),
+    ("br;q=1.0, gzip;q=0.8", True),
+    ("gzip;q=0", False),
+    ("*", True),
+    ("*;q=0, gzip", True),       # An explicit gzip entry wins over the wildcard
+    ("gzip, *;q=0", True),
+    ("gzip;q=x", False),         # Unparseable q values are ignored, not a 500
+    ("gzip;q=x, *", True),
+    ("identity", False),
+    ("", False),
+])
+def test_accepts_gzip(header, expected):
+    """Test that Accept-Encoding parsing honours q values and survives malformed ones."""
+    from src.utils.compression import accepts_gzip
+
+    assert accepts_gzip(header) is expected
+
+def post_callback(client, output, inputs):
+    """POST a callback request the way the Dash renderer does, accepting gzip."""
+    parts = output[2:-2].split("...") if output.startswith("..") else [output]
+    outputs = [dict(zip(("id", "property"), part.rsplit(".", 1))) for part in parts]
+    payload = {"output": output, "outputs": outputs if len(outputs) > 1 else outputs[0],
+               "inputs": inputs, "changedPropIds": [], "state": []}
+    return client.post("/_dash-update-component", json=payload, headers={"Accept-Encoding": "gzip"})
+
+def test_callback_responses_fit_size_budgets():
+    """Chart responses are compressed and stay within their size budgets."""
+    import gzip
+    from src.app import app
+
+    client = app.server.test_client()
+    filters = [{"id": "city-filter", "property": "value", "value": []},
+               {"id": "province-filter", "property": "value", "value": []},
+               {"id": "bedrooms-slider", "property": "value", "value": [0, 10]},
+               {"id": "bathrooms-slider", "property": "value", "value": [0, 10]}]
+    response = post_callback(client, "filtered-data.data", filters)
+    key = json.loads(gzip.decompress(response.data) if response.content_encoding == "gzip" else response.data)
+    key = key["response"]["filtered-data"]["data"]
+
+    for output, (raw_budget, gzip_budget) in RESPONSE_BUDGETS.items():
+        response = post_callback(client, output, [{"id": "filtered-data", "property": "data", "value": key}])
+        assert response.status_code == 200
+        assert response.content_encoding == "gzip", output
+        assert len(response.data) <= gzip_budget, output
+        assert len(gzip.decompress(response.data)) <= raw_budget, output
+
+def test_chart_records_are_rounded_for_display():
+    """Prices are sent as whole dollars and coordinates at 4 decimals."""
+    aggregates = get_filter_aggregates(encode_filter_key(["Toronto", "Vancouver"], [], [0, 10], [0, 10]))
+
+    assert all(isinstance(record["median"], int) for record in aggregates["city_stats"])
+    for marker in aggregates["map_markers"]:
+        assert marker["Latitude"] == round(marker["Latitude"], 4)
+        assert marker["Number_Beds"] == round(marker["Number_Beds"], 2)
+
+def test_downsample_outliers_caps_groups_and_keeps_extremes():
+    """Each group keeps at most cap outliers, including its min and max, and counts the rest."""
+    outliers = pd.DataFrame({
+        "City": ["Toronto"] * 100 + ["Victoria"] * 3,
+        "Price": list(range(2_000_000, 2_100_000, 1000))[::-1] + [10, 20, 30],
+    })
+    sampled = downsample_outliers(outliers, "City", cap=10)
+
+    toronto = sampled[sampled["City"] == "Toronto"]
+    assert len(toronto) == 10 and (toronto["elided"] == 90).all()
+    assert toronto["Price"].min() == 2_000_000 and toronto["Price"].max() == 2_099_000
+    assert sampled[sampled["City"] == "Victoria"]["elided"].tolist() == [0, 0, 0]
+    assert sampled.equals(downsample_outliers(outliers.sample(frac=1, random_state=1), "City", cap=10))
+    assert len(downsample_outliers(outliers, "City", cap=0)) == len(outliers)
+
+def test_chart1_outlier_tooltip_reports_elided_points():
+    """The outlier tooltip shows how many outliers were not drawn."""
+    assert "Similar outliers not drawn" in json.dumps(CHART1_TEMPLATE.spec)
@@ -5,6 +5,7 @@ from dash.development.base_component import Component
 from src.components.charts import create_map_card, create_chart1_card, create_chart2_card, create_chart3_card
 from src.components.sidebar import create_sidebar
 from src.components.summary_cards import create_summary_cards
+from src.utils.filter_catalog import FilterCatalog
 
 @pytest.fixture
 def sample_df():
@@ -34,7 +35,7 @@ def test_chart3_card():
 
 def test_sidebar(sample_df):
     """Test if sidebar returns a valid Dash component."""
-    assert isinstance(create_sidebar(sample_df), Component)
+    assert isinstance(create_sidebar(FilterCatalog(sample_df)), Component)
 
 def test_summary_cards():
     """Test if summary cards return a valid Dash component."""
@@ -1,13 +1,344 @@
+import json
+import threading
+import time
 import pytest
+import numpy as np
 import pandas as pd
-from src.utils.data_loader import load_data
+from src.utils.data_loader import load_data, GEOJSON_PATH, compact_dtypes, write_arrow, read_arrow_mmap
+from src.utils.build_geojson import signed_area
+from src.utils.build_data import build_data, append_data
+from src.utils import data_context
+from src.utils.data_context import DataContext
+from src.utils.filter_index import FilterIndex
+from src.utils.filter_catalog import FilterCatalog
+from src.utils.result_cache import ResultCache
+from src.utils.aggregates import AggregateCube
+from src.utils.sketches import QuantileSketchSet
+from src.utils.profiling import ProfileWriter, register_profiling
+from src.utils.env import env_flag
+from benchmarks.synthetic import generate_listings
 
 def test_load_data_structure():
-    df = load_data()
-    assert isinstance(df, pd.DataFrame)
+    locations, housing = load_data()
+    assert isinstance(locations, pd.DataFrame) and isinstance(housing, pd.DataFrame)
     expected_columns = {"City", "Province", "Number_Beds", "Number_Baths", "Price"}
-    assert expected_columns.issubset(df.columns)
+    assert expected_columns.issubset(housing.columns)
+    assert {"City", "Province", "Latitude", "Longitude"}.issubset(locations.columns)
 
 def test_load_data_not_empty():
-    df = load_data()
-    assert not df.empty
+    locations, housing = load_data()
+    assert not housing.empty
+    assert not locations.empty
+
+def test_filter_index_matches_boolean_masks():
+    df = pd.DataFrame({
+        "City": ["Vancouver", "Toronto", "Montreal", "Toronto", "Victoria"],
+        "Province": ["BC", "ON", "QC", "ON", "BC"],
+        "Number_Beds": [2, 3, 4, 1, 5],
+        "Number_Baths": [1, 2, 3, 1, 2],
+    })
+    index = FilterIndex(df)
+
+    positions = index.filter(("Toronto", "Victoria"), ("BC", "ON"), (1, 4), (1, 2))
+    expected = df.index[df["City"].isin(["Toronto", "Victoria"]) & df["Number_Beds"].between(1, 4)]
+    assert positions.tolist() == expected.tolist()
+    assert index.filter((), (), (0, 10), (0, 10)).tolist() == list(range(len(df)))
+    assert len(index.filter(("Calgary",), (), (0, 10), (0, 10))) == 0
+
+def test_result_cache_evicts_to_byte_budget():
+    cache = ResultCache(max_bytes=1000)
+    for key in range(3):
+        cache.put(key, np.zeros(100, dtype=np.int32))  # 400 bytes each
+
+    assert 0 not in cache
+    assert cache.get(1) is not None
+    assert cache.get(0) is None
+    stats = cache.stats()
+    assert stats["bytes"] <= 1000
+    assert (stats["entries"], stats["hits"], stats["misses"], stats["evictions"]) == (2, 1, 1, 1)
+
+def test_result_cache_computes_concurrent_misses_once():
+    cache = ResultCache(max_bytes=1000)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("key", compute)))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ["value"] * 5
+
+def test_aggregate_cube_matches_row_statistics():
+    df = pd.DataFrame({
+        "City": ["Vancouver", "Vancouver", "Toronto", "Toronto", "Regina"],
+        "Province": ["BC", "BC", "ON", "ON", "SK"],
+        "Number_Beds": [1, 3, 2, 4, 2],
+        "Number_Baths": [1, 2, 1, 3, 1],
+        "Price": [500000.0, 900000.0, 700000.0, 1500000.0, 300000.0],
+    })
+    cube = AggregateCube(df)
+
+    summary = cube.summarize(("Vancouver", "Toronto"), (), (2, 4), (1, 2))
+    expected = df[df["City"].isin(["Vancouver", "Toronto"])
+                  & df["Number_Beds"].between(2, 4) & df["Number_Baths"].between(1, 2)]
+    assert summary["count"] == len(expected)
+    assert summary["avg_bedrooms"] == pytest.approx(expected["Number_Beds"].mean())
+    assert summary["avg_bathrooms"] == pytest.approx(expected["Number_Baths"].mean())
+    assert (summary["min_price"], summary["max_price"]) == (expected["Price"].min(), expected["Price"].max())
+    assert cube.summarize((), ("QC",), (0, 10), (0, 10))["count"] == 0
+
+def test_quantile_sketches_are_exact_for_small_cells_and_bounded_otherwise():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "City": rng.choice(["Vancouver", "Toronto"], 5000),
+        "Province": "BC",
+        "Number_Beds": rng.integers(1, 4, 5000),
+        "Number_Baths": rng.integers(1, 3, 5000),
+        "Price": rng.lognormal(13.5, 0.5, 5000),
+    })
+
+    exact = QuantileSketchSet(df, epsilon=1e-4)
+    stats = exact.boxplot_stats(exact.layout.select_cells(), "Number_Beds")
+    expected = df.groupby("Number_Beds")["Price"].describe()
+    assert np.allclose(stats["median"], expected["50%"])
+    assert np.allclose(stats["Q3"], expected["75%"])
+
+    sketch = QuantileSketchSet(df, epsilon=0.01)
+    median = sketch.quantile(sketch.layout.select_cells(("Toronto",), (), (1, 2), (1, 2)), 0.5)
+    prices = np.sort(df.loc[(df["City"] == "Toronto") & (df["Number_Beds"] <= 2), "Price"])
+    assert abs(np.searchsorted(prices, median) / len(prices) - 0.5) <= 0.02
+
+def test_bundled_geojson_is_simplified_and_d3_wound():
+    geojson = json.loads(GEOJSON_PATH.read_text(encoding="utf-8"))
+    names = {f["properties"]["name"] for f in geojson["features"]}
+    assert {"British Columbia", "Ontario", "Quebec", "Nova Scotia"}.issubset(names)
+
+    # Exterior rings must be clockwise for d3-geo, which Vega uses for geoshapes
+    exterior = np.asarray(geojson["features"][0]["geometry"]["coordinates"][0][0])
+    assert signed_area(exterior) < 0
+    assert GEOJSON_PATH.stat().st_size < 500_000
+
+def test_build_data_dedupes_and_appends_incrementally(tmp_path):
+    columns = ["City", "Price", "Address", "Number_Beds", "Number_Baths", "Province",
+               "Population", "Latitude", "Longitude", "Median_Family_Income"]
+    rows = [
+        ["Nanaimo", 600000, "1 A St", 3, 2, "Ontario", 90000, 49.16, -123.94, 80000],
+        ["Nanaimo", 600000, "1 A St", 3, 2, "Ontario", 90000, 49.16, -123.94, 80000],  # duplicate
+        ["Halifax", 500000, "2 B St", 2, 1, "Nova Scotia", 400000, 44.89, 63.10, 85000],
+        ["Halifax", 50000000, "3 C St", 4, 3, "Nova Scotia", 400000, 44.89, 63.10, 85000],  # out of bounds
+    ]
+    pd.DataFrame(rows, columns=columns).to_csv(tmp_path / "raw.csv", index=False)
+    housing, locations = build_data(tmp_path / "raw.csv", tmp_path, chunksize=2)
+
+    assert housing["Price"].tolist() == [600000, 500000]
+    assert housing.loc[0, "Province"] == "British Columbia"
+    assert locations.loc[locations["City"] == "Halifax", "Longitude"].item() == -63.5752
+
+    batch = [rows[0], ["Victoria", 900000, "4 D St", 3, 2, "British Columbia", 100000, 48.43, -123.37, 95000]]
+    pd.DataFrame(batch, columns=columns).to_csv(tmp_path / "batch.csv", index=False)
+    housing, locations, added = append_data([tmp_path / "batch.csv"], tmp_path)
+
+    assert added == 1
+    assert housing["City"].tolist() == ["Nanaimo", "Halifax", "Victoria"]
+    assert locations["City"].tolist() == ["Nanaimo", "Victoria", "Halifax"]
+    assert append_data([tmp_path / "batch.csv"], tmp_path)[2] == 0
+
+@pytest.mark.parametrize("failing_file", ["housing_data.feather", "housing_hashes.npy"])
+def test_append_rerun_after_failed_write_adds_listings_once(tmp_path, monkeypatch, failing_file):
+    from src.utils import build_data as build
+
+    columns = ["City", "Price", "Address", "Number_Beds", "Number_Baths", "Province",
+               "Population", "Latitude", "Longitude", "Median_Family_Income"]
+    pd.DataFrame([["Halifax", 500000, "2 B St", 2, 1, "Nova Scotia", 400000, 44.65, -63.58, 85000]],
+                 columns=columns).to_csv(tmp_path / "raw.csv", index=False)
+    pd.DataFrame([["Victoria", 900000, "4 D St", 3, 2, "British Columbia", 100000, 48.43, -123.37, 95000]],
+                 columns=columns).to_csv(tmp_path / "batch.csv", index=False)
+    build_data(tmp_path / "raw.csv", tmp_path)
+
+    write_atomic = build.write_atomic
+    def failing_write(path, write):
+        if path.name == failing_file:
+            raise OSError("disk full")
+        write_atomic(path, write)
+
+    monkeypatch.setattr(build, "write_atomic", failing_write)
+    with pytest.raises(OSError):
+        append_data([tmp_path / "batch.csv"], tmp_path)
+    monkeypatch.setattr(build, "write_atomic", write_atomic)
+
+    housing, _, added = append_data([tmp_path / "batch.csv"], tmp_path)
+    assert added == 1
+    assert housing["City"].tolist() == ["Halifax", "Victoria"]
+
+def test_arrow_mmap_round_trip_is_zero_copy(tmp_path):
+    df = compact_dtypes(pd.DataFrame({
+        "City": ["Toronto", "Regina", "Toronto"],
+        "Province": ["Ontario", "Saskatchewan", "Ontario"],
+        "Price": [899000.0, 299000.4, 1200000.0],
+        "Number_Beds": [2, 3, 4],
+    }))
+    write_arrow(df, tmp_path / "housing.arrow")
+    mapped = read_arrow_mmap(tmp_path / "housing.arrow")
+
+    pd.testing.assert_frame_equal(mapped, df)
+    assert mapped["Price"].tolist() == [899000, 299000, 1200000]
+    # Views of the mapped file are read-only rather than private copies
+    assert not mapped["Price"].to_numpy().flags.writeable
+    assert not mapped["City"].cat.codes.to_numpy().flags.writeable
+
+def write_processed_tables(data_dir, prices):
+    pd.DataFrame({"Province": ["Ontario"], "City": ["Toronto"], "Latitude": [43.74], "Longitude": [-79.37]}) \
+        .to_feather(data_dir / "locations.feather")
+    n = len(prices)
+    pd.DataFrame({"Province": ["Ontario"] * n, "City": ["Toronto"] * n, "Price": prices,
+                  "Number_Beds": [2] * n, "Number_Baths": [1] * n, "Population": [5647656] * n,
+                  "Median_Family_Income": [97000.0] * n}).to_feather(data_dir / "housing_data.feather")
+
+def test_data_context_reads_the_configured_data_directory(tmp_path, monkeypatch):
+    write_processed_tables(tmp_path, [899000.0, 1200000.0])
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+
+    context = DataContext.load()
+
+    assert context.data_dir == tmp_path.resolve()
+    assert len(context.housing) == 2
+    assert context.housing["City"].dtype == "category"
+    assert context.cube.summarize()["max_price"] == 1200000
+
+def test_reload_swaps_in_changed_data_with_fresh_caches(tmp_path, monkeypatch):
+    write_processed_tables(tmp_path, [899000.0, 1200000.0])
+    old = DataContext.load(tmp_path)
+    monkeypatch.setattr(data_context, "_context", old)
+    old.filter_cache.put("key", np.arange(2))
+
+    assert not data_context.reload_data_context()  # Files unchanged
+
+    write_processed_tables(tmp_path, [899000.0, 1200000.0, 650000.0])
+    assert data_context.reload_data_context()
+    new = data_context.get_data_context()
+
+    assert new is not old and len(new.housing) == 3 and len(new.filter_cache) == 0
+    assert new.catalog is not old.catalog
+    assert len(old.housing) == 2  # Requests still holding the old context are unaffected
+
+def test_synthetic_listings_scale_per_city():
+    _, housing = load_data()
+    synthetic = generate_listings(housing, 10)
+
+    counts = housing.groupby(["City", "Province"], observed=True).size()
+    synthetic_counts = synthetic.groupby(["City", "Province"], observed=True).size()
+    assert synthetic_counts.equals(counts * 10)
+    assert synthetic["Price"].between(housing["Price"].min(), housing["Price"].max()).all()
+    assert abs(synthetic["Price"].median() / housing["Price"].median() - 1) < 0.05
+    assert synthetic.dtypes.equals(housing.dtypes)
+
+def test_profiling_off_by_default_and_rotates(tmp_path):
+    def update_chart(data):
+        return sum(range(1000))
+
+    class FakeApp:
+        callback_map = {"chart.spec": {"callback": update_chart}}
+
+    app = FakeApp()
+    assert not register_profiling(app, sample_rate=0, allow_header=False)
+    assert app.callback_map["chart.spec"]["callback"] is update_chart  # Nothing wrapped when off
+
+    assert register_profiling(app, sample_rate=1, writer=ProfileWriter(tmp_path, max_files=2))
+    for key in ("a", "b", "c"):
+        assert app.callback_map["chart.spec"]["callback"](key) == sum(range(1000))
+
+    profiles = sorted(tmp_path.glob("*.prof"))
+    assert len(profiles) == 2 and all("update_chart" in p.name for p in profiles)
+    assert [json.loads(p.with_suffix(".json").read_text())["inputs"] for p in profiles] == [["b"], ["c"]]
+
+def test_filter_catalog_matches_table_scans():
+    _, housing = load_data()
+    catalog = FilterCatalog(housing)
+
+    for provinces in ([], ["Ontario"], ["Quebec", "British Columbia"]):
+        rows = housing[housing["Province"].isin(provinces)] if provinces else housing
+        assert [o["value"] for o in catalog.city_options(provinces)] == list(rows["City"].unique())
+    assert [o["value"] for o in catalog.province_options()] == list(housing["Province"].unique())
+    assert catalog.reset_values() == (
+        ["Vancouver", "Toronto", "Montreal", "Ottawa"], [],
+        [housing["Number_Beds"].min(), housing["Number_Beds"].max()],
+        [housing["Number_Baths"].min(), housing["Number_Baths"].max()],
+    )
+    with pytest.raises(AttributeError):
+        catalog.cities = ()
+
+def test_warmup_fills_caches_and_reports_progress(monkeypatch):
+    from src.app import app
+    from src.utils import warmup
+    from src.utils.metrics import registry
+    from src.utils.warmup import filter_states, start_warmup, warm_state, progress
+
+    rendered = []
+    monkeypatch.setattr(warmup, "chart_callbacks", lambda app: [rendered.append])
+    context = data_context.get_data_context()
+    keys = filter_states(context.catalog, kinds=["default", "provinces"], queries_file="")
+    assert len(keys) == 1 + len(context.catalog.provinces)
+
+    for thread in start_warmup(app, context, keys, threads=2):
+        thread.join(timeout=60)
+
+    assert progress.done == len(keys) and progress.failed == 0
+    assert all(key in context.aggregate_cache for key in keys)
+    assert rendered == keys[:1]  # Rendering once compiles the templates; the rest only aggregate
+    assert f'dashboard_warmup_states{{status="done"}} {len(keys)}' in registry.render()
+
+    # A context replaced by a reload is still aggregated, but never rendered against the new one
+    stale = DataContext(context.locations, context.housing)
+    assert warm_state(keys[1], stale, [rendered.append])
+    assert keys[1] in stale.aggregate_cache and rendered == keys[:1]
+
+def test_job_slots_bound_concurrency_and_survive_killed_jobs(tmp_path):
+    import subprocess
+    import sys
+    from src.utils.background import JobSlots, background_callback_options, fcntl
+
+    assert background_callback_options(enabled=False) == {}
+    if fcntl is None:
+        pytest.skip("job slots need fcntl")
+    slots = JobSlots(tmp_path, 1, poll=0.01)
+    acquired = threading.Event()
+
+    def job():
+        with slots.acquire():
+            acquired.set()
+
+    with slots.acquire():
+        waiting = threading.Thread(target=job)
+        waiting.start()
+        assert not acquired.wait(0.2)  # The only slot is taken
+    assert acquired.wait(5)
+    waiting.join()
+
+    # A job process killed while holding its slot gives it back
+    holder = subprocess.Popen([sys.executable, "-c", (
+        "import fcntl, sys, time; f = open(sys.argv[1], 'a'); fcntl.flock(f, fcntl.LOCK_EX); "
+        "print('locked', flush=True); time.sleep(60)"), str(tmp_path / "slot-0.lock")], stdout=subprocess.PIPE, text=True)
+    assert holder.stdout.readline().strip() == "locked"
+    holder.kill()
+    holder.wait()
+    with slots.acquire():
+        pass
+
+def test_env_flag_accepts_the_same_spellings_everywhere(monkeypatch):
+    for value, expected in (("1", True), ("Yes", True), (" on ", True), ("0", False), ("FALSE", False), ("off", False)):
+        monkeypatch.setenv("DASHBOARD_TEST_FLAG", value)
+        assert env_flag("DASHBOARD_TEST_FLAG") is expected
+    monkeypatch.setenv("DASHBOARD_TEST_FLAG", "")
+    assert env_flag("DASHBOARD_TEST_FLAG", default=True) is True
+    monkeypatch.setenv("DASHBOARD_TEST_FLAG", "ture")
+    with pytest.raises(ValueError):
+        env_flag("DASHBOARD_TEST_FLAG")